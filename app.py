@@ -4,6 +4,7 @@ import signal
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy import create_engine
@@ -12,8 +13,16 @@ from sqlalchemy.orm import sessionmaker
 from services.ai_services import AIManager
 from scripts.bot_handlers import register_handlers
 from scripts.dependincies import BotDependencies  
+from scripts.retention import archive_finished_reminders
+from services.bot_webhook import run_webhook
+from services.calendar_pull import CalendarPullSync
+from services.calendar_sync import CalendarSyncWorker
+from services.g_calendar import GoogleCalendarClient
+from services.token_refresher import refresh_expiring_google_tokens
 from utils.language_manager import LanguageManager
 from utils.logger import setup_logging
+from utils.metrics import CALENDAR_METRICS
+from utils.middlewares import ChatSerializationMiddleware, DuplicateUpdateMiddleware
 from scripts.models import create_database
 from config.settings import Settings 
 
@@ -41,37 +50,127 @@ async def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    jobstores = {'default': SQLAlchemyJobStore(url=db_url)}
+    # Reminder jobs are persisted; maintenance jobs are re-registered on every start
+    jobstores = {'default': SQLAlchemyJobStore(url=db_url), 'maintenance': MemoryJobStore()}
     scheduler = AsyncIOScheduler(jobstores=jobstores, timezone=settings.timezone)
     bot = None
+    calendar_client = GoogleCalendarClient()
+    calendar_sync = None
 
     try:
         create_database(settings)
         engine = create_engine(db_url)
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+        # List and settings screens read through their own pool so they don't compete with reminder writes
+        read_engine = create_engine(settings.db_replica_url or db_url,
+                                    pool_size=settings.db_read_pool_size, pool_pre_ping=True)
+        ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
         bot = Bot(token=settings.telegram_bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
         dp = Dispatcher()
         ai_manager = AIManager(api_key=settings.gemini_api_key)
         lm = LanguageManager()
+        calendar_sync = CalendarSyncWorker(SessionLocal, calendar_client, settings.calendar_sync_workers,
+                                           settings.calendar_sync_user_interval_seconds,
+                                           settings.calendar_sync_max_attempts)
+        calendar_sync.start()
         # Create the dependencies object
         deps = BotDependencies(
             bot=bot,
             session_factory=SessionLocal,
             scheduler=scheduler,
             ai_manager=ai_manager,
-            lm=lm
+            lm=lm,
+            read_session_factory=ReadSessionLocal,
+            calendar_client=calendar_client,
+            calendar_sync=calendar_sync
         )
 
+        # Duplicates are dropped before they are queued behind their chat
+        dedup = DuplicateUpdateMiddleware(settings.dedup_cache_size,
+                                          SessionLocal if settings.dedup_use_db else None)
+        dp.update.outer_middleware(dedup)
+        update_queue = ChatSerializationMiddleware(settings.update_concurrency_limit)
+        dp.update.outer_middleware(update_queue)
         register_handlers(dp, deps, lm)
 
+        scheduler.add_job(
+            archive_finished_reminders,
+            trigger='interval',
+            minutes=settings.archive_interval_minutes,
+            args=[SessionLocal, settings.archive_retention_days, settings.archive_batch_size],
+            id='archive_finished_reminders',
+            jobstore='maintenance',
+            replace_existing=True
+        )
+
+        scheduler.add_job(
+            update_queue.log_metrics,
+            trigger='interval',
+            minutes=1,
+            id='log_update_queue_metrics',
+            jobstore='maintenance',
+            replace_existing=True
+        )
+
+        scheduler.add_job(
+            CALENDAR_METRICS.log_metrics,
+            trigger='interval',
+            minutes=settings.calendar_metrics_log_minutes,
+            id='log_calendar_metrics',
+            jobstore='maintenance',
+            replace_existing=True
+        )
+
+        scheduler.add_job(
+            refresh_expiring_google_tokens,
+            trigger='interval',
+            minutes=settings.google_token_refresh_interval_minutes,
+            args=[SessionLocal, calendar_client, settings.google_token_refresh_window_minutes,
+                  settings.google_token_refresh_batch_size, settings.google_token_refresh_max_per_run,
+                  settings.google_token_refresh_max_backoff_minutes],
+            id='refresh_expiring_google_tokens',
+            jobstore='maintenance',
+            replace_existing=True
+        )
+
+        calendar_pull = CalendarPullSync(SessionLocal, calendar_client, scheduler, settings.telegram_bot_token)
+        scheduler.add_job(
+            calendar_pull.sync_all,
+            trigger='interval',
+            minutes=settings.google_sync_interval_minutes,
+            args=[settings.google_sync_concurrency, settings.google_sync_max_users_per_run],
+            id='pull_google_calendar_changes',
+            jobstore='maintenance',
+            replace_existing=True
+        )
+
+        if settings.dedup_use_db:
+            scheduler.add_job(
+                dedup.cleanup,
+                trigger='interval',
+                hours=1,
+                args=[settings.dedup_ttl_hours],
+                id='cleanup_processed_updates',
+                jobstore='maintenance',
+                replace_existing=True
+            )
+
         scheduler.start()
         logger.info("Bot started successfully")
 
         # Graceful shutdown logic
-        polling_task = asyncio.create_task(dp.start_polling(bot))
+        if settings.bot_mode == "webhook":
+            updates_task = asyncio.create_task(run_webhook(dp, bot, settings))
+        else:
+            # getUpdates is rejected while a webhook is set
+            await bot.delete_webhook()
+            updates_task = asyncio.create_task(dp.start_polling(bot))
         shutdown_task = asyncio.create_task(shutdown_event.wait())
-        done, pending = await asyncio.wait([polling_task, shutdown_task], return_when=asyncio.FIRST_COMPLETED)
+        done, pending = await asyncio.wait([updates_task, shutdown_task], return_when=asyncio.FIRST_COMPLETED)
+        if updates_task in done and updates_task.exception():
+            logger.error(f"Update delivery stopped: {updates_task.exception()}")
         for task in pending:
             task.cancel()
 
@@ -82,6 +181,9 @@ async def main():
             scheduler.shutdown(wait=False)
         if bot:
             await bot.session.close()
+        if calendar_sync:
+            await calendar_sync.stop()
+        await calendar_client.close()
         logger.info("Bot shut down gracefully")
 
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offline load test of the Google Calendar path: simulated users refresh their
+token, push a batch of reminder inserts and pull their changes through
+GoogleCalendarClient, against the fake Calendar/OAuth server in tests/fake_google.py.
+
+    python benchmarks/calendar_load.py [--users 500] [--concurrency 50] [--events 20] \
+        [--latency-ms 80] [--error-rate 0.02]
+
+Prints wall time and the per-operation counters and latencies from CALENDAR_METRICS.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import g_calendar
+from services.g_calendar import GoogleCalendarClient, CalendarOperation, build_event_body, MAX_BATCH_SIZE
+from tests.fake_google import FakeGoogle, run_fake_google
+from utils.metrics import CALENDAR_METRICS
+
+
+async def simulate_user(client: GoogleCalendarClient, refresh_token: str, events: int) -> bool:
+    # One calendar per user, like real accounts
+    calendar_id = f"{uuid.uuid4().hex}@example.com"
+    tokens = await client.refresh_access_token(refresh_token, "client", "secret")
+    if not tokens:
+        return False
+
+    start = datetime.utcnow() + timedelta(days=1)
+    operations = [
+        CalendarOperation(action='insert', event_id=uuid.uuid4(),
+                          body=build_event_body(f"Reminder {number}", "", start + timedelta(hours=number)))
+        for number in range(events)
+    ]
+    for offset in range(0, len(operations), MAX_BATCH_SIZE):
+        await client.batch(tokens['access_token'], operations[offset:offset + MAX_BATCH_SIZE], calendar_id)
+
+    page = await client.list_events(tokens['access_token'], calendar_id)
+    while page.get('nextPageToken'):
+        page = await client.list_events(tokens['access_token'], calendar_id, page_token=page['nextPageToken'])
+    return True
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Load test the calendar client against a fake Google server")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--events", type=int, default=20, help="reminders pushed per user")
+    parser.add_argument("--latency-ms", type=float, default=80, help="added by the fake to every request")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+    # Injected errors are counted in the metrics; one log line per failure would drown the summary
+    logging.disable(logging.ERROR)
+
+    fake = FakeGoogle(latency=args.latency_ms / 1000, error_rate=args.error_rate)
+    async with run_fake_google(fake) as (_, base_url):
+        g_calendar.TOKEN_URI = f"{base_url}/token"
+        g_calendar.CALENDAR_API_BASE = f"{base_url}/calendar/v3"
+        g_calendar.BATCH_URL = f"{base_url}/batch/calendar/v3"
+
+        client = GoogleCalendarClient(max_connections=args.concurrency)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def run_user(refresh_token):
+            async with semaphore:
+                try:
+                    return await simulate_user(client, refresh_token, args.events)
+                except Exception:
+                    return False
+
+        refresh_tokens = [fake.issue_refresh_token() for _ in range(args.users)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*[run_user(refresh_token) for refresh_token in refresh_tokens])
+        elapsed = time.perf_counter() - started
+        await client.close()
+
+    print(f"{args.users} users, concurrency {args.concurrency}: {elapsed:.2f}s, "
+          f"{sum(results)} completed, {len(results) - sum(results)} failed")
+    print(f"fake server requests: {fake.requests}")
+    metrics = CALENDAR_METRICS.metrics()
+    for operation, stats in sorted(metrics["latency"].items()):
+        outcomes = ", ".join(f"{outcome}={count}" for (op, outcome), count in sorted(metrics["counts"].items())
+                             if op == operation)
+        print(f"{operation:<14} {outcomes}; avg {stats['avg'] * 1000:.0f} ms, "
+              f"p50<={stats['p50']}s p95<={stats['p95']}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
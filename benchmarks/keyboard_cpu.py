@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Per-reply CPU of building the bot's keyboards: the memoized static markups
+in scripts/bot_handlers.py against rebuilding them on every reply (the
+undecorated function), plus the dynamic cancellation keyboard for one page.
+
+    python benchmarks/keyboard_cpu.py [--iterations 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts import bot_handlers
+from utils.language_manager import LanguageManager
+
+STATIC_KEYBOARDS = ["get_main_buttons", "get_settings_inline_buttons", "get_main_inline_menu"]
+
+
+def per_call(function, iterations: int) -> float:
+    started = time.process_time()
+    for _ in range(iterations):
+        function()
+    return (time.process_time() - started) / iterations
+
+
+def fake_page(size: int) -> list:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            event_name=f"Reminder number {number} with a fairly long name to truncate",
+            schedule=SimpleNamespace(job_id=str(uuid.uuid4()), scheduled_time=now + timedelta(hours=number))
+        )
+        for number in range(size)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-reply CPU of keyboard markups")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--lang", default="en", choices=bot_handlers.SUPPORTED_LANGUAGES)
+    args = parser.parse_args()
+
+    lm = LanguageManager()
+    bot_handlers.warm_keyboard_cache(lm)
+
+    print(f"{args.iterations} iterations, CPU us per reply")
+    for name in STATIC_KEYBOARDS:
+        cached = getattr(bot_handlers, name)
+        rebuilt = per_call(lambda: cached.__wrapped__(lm, args.lang), args.iterations)
+        memoized = per_call(lambda: cached(lm, args.lang), args.iterations)
+        print(f"{name:<28} rebuilt {rebuilt * 1e6:8.1f}   memoized {memoized * 1e6:8.2f}")
+
+    page = fake_page(bot_handlers.ITEMS_PER_PAGE)
+    dynamic = per_call(lambda: bot_handlers.create_cancellation_keyboard(page, has_previous=True, has_next=True),
+                       args.iterations)
+    print(f"{'create_cancellation_keyboard':<28} {dynamic * 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
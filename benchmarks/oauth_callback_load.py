@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Load test of the OAuth web service callback: fires concurrent Google OAuth
+redirects at /oath2callback and reports status codes and latency
+percentiles, plus the latency of /health during the burst (it stays low only
+if the code exchange and token writes are kept off the event loop).
+
+    python benchmarks/oauth_callback_load.py [--callbacks 200] [--concurrency 50] [--latency-ms 200]
+    python benchmarks/oauth_callback_load.py --url https://example.com --chat-id 123 --chat-id 456
+
+Without --url the web service app runs in-process against the database in the
+DB_* settings, with the token exchange going to the fake Google server from
+tests/fake_google.py (`--latency-ms` per exchange). Throwaway users are
+created for the synthetic chat ids and removed afterwards. With --url the
+callbacks go to a running service; its exchange only succeeds if it is pointed
+at a fake Google server, and --chat-id should name existing test users.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The fake Google server is plain HTTP
+os.environ.setdefault("OAUTHLIB_INSECURE_TRANSPORT", "1")
+
+from tests.fake_google import FakeGoogle, run_fake_google
+
+LOCAL_PORT = 8092
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def fire_callbacks(base_url: str, chat_ids: list, callbacks: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    health_latencies = []
+    statuses = {}
+
+    async with aiohttp.ClientSession() as session:
+        async def callback(number):
+            async with semaphore:
+                chat_id = chat_ids[number % len(chat_ids)]
+                url = f"{base_url}/oath2callback?state={chat_id}|en&code=load-{uuid.uuid4().hex}"
+                started = time.perf_counter()
+                async with session.get(url) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+
+        async def probe_health(done: asyncio.Event):
+            while not done.is_set():
+                started = time.perf_counter()
+                async with session.get(f"{base_url}/health") as response:
+                    await response.read()
+                health_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        done = asyncio.Event()
+        probe = asyncio.create_task(probe_health(done))
+        started = time.perf_counter()
+        await asyncio.gather(*[callback(number) for number in range(callbacks)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe
+
+    return elapsed, sorted(latencies), sorted(health_latencies), statuses
+
+
+async def run_in_process(args):
+    from scripts import database_crud as db
+    from scripts.models import Users
+    from services import g_calendar, web_service
+
+    fake = FakeGoogle(latency=args.latency_ms / 1000)
+    async with run_fake_google(fake) as (_, google_url):
+        g_calendar.TOKEN_URI = f"{google_url}/token"
+        g_calendar.client_config['web']['token_uri'] = g_calendar.TOKEN_URI
+
+        app = web_service.create_app()
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host="127.0.0.1", port=LOCAL_PORT).start()
+
+        chat_ids = [9 * 10 ** 11 + number for number in range(args.users)]
+        with app['session_factory']() as session:
+            for chat_id in chat_ids:
+                db.get_or_create_user(session, chat_id, "load test")
+        try:
+            return await fire_callbacks(f"http://127.0.0.1:{LOCAL_PORT}", chat_ids, args.callbacks, args.concurrency)
+        finally:
+            with app['session_factory']() as session:
+                session.query(Users).filter(Users.chat_id.in_(chat_ids)).delete(synchronize_session=False)
+                session.commit()
+            await runner.cleanup()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent OAuth callbacks against the web service")
+    parser.add_argument("--url", help="base URL of a running web service; default: in-process app")
+    parser.add_argument("--chat-id", type=int, action="append", help="chat id for the state parameter (--url)")
+    parser.add_argument("--callbacks", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50, help="throwaway users, in-process only")
+    parser.add_argument("--latency-ms", type=float, default=200, help="fake token exchange time, in-process only")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.chat_id:
+            parser.error("--url needs at least one --chat-id")
+        results = await fire_callbacks(args.url.rstrip('/'), args.chat_id, args.callbacks, args.concurrency)
+    else:
+        results = await run_in_process(args)
+    elapsed, latencies, health_latencies, statuses = results
+
+    print(f"{args.callbacks} callbacks, concurrency {args.concurrency}: {elapsed:.2f}s, statuses {statuses}")
+    print(f"callback latency p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, max {latencies[-1] * 1000:.0f} ms")
+    if health_latencies:
+        print(f"/health during the burst: p50 {percentile(health_latencies, 0.5) * 1000:.1f} ms, "
+              f"max {health_latencies[-1] * 1000:.1f} ms ({len(health_latencies)} probes)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load test for the webhook update path: posts synthetic Telegram updates
+concurrently and reports status codes, throughput and latency percentiles.
+
+    python benchmarks/webhook_load.py [--updates 2000] [--concurrency 100] [--max-in-flight 40]
+    python benchmarks/webhook_load.py --url http://localhost:8081/telegram/webhook --secret <WEBHOOK_SECRET>
+
+Without --url an in-process BoundedRequestHandler is served on a local port
+with a handler that simulates `--handler-ms` of work per update, so the
+in-flight limit and back-pressure can be measured without Telegram or a
+database. With --url the updates go to a running bot in webhook mode; its
+handlers will try to reply to the synthetic chats.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bot_webhook import BoundedRequestHandler
+
+LOCAL_PATH = "/telegram/webhook"
+
+
+def synthetic_update(update_id: int) -> dict:
+    chat_id = 10 ** 9 + update_id % 1000
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private", "first_name": "load"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "load"},
+            "text": f"load test message {update_id}",
+        },
+    }
+
+
+async def start_local_server(args):
+    dp = Dispatcher()
+    handled = []
+
+    @dp.message()
+    async def simulated_handler(message: Message):
+        await asyncio.sleep(args.handler_ms / 1000)
+        handled.append(message.message_id)
+
+    bot = Bot(token="123456:load-test")
+    app = web.Application()
+    handler = BoundedRequestHandler(dispatcher=dp, bot=bot, max_in_flight=args.max_in_flight,
+                                    secret_token=args.secret)
+    handler.register(app, path=LOCAL_PATH)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host="127.0.0.1", port=args.port)
+    await site.start()
+    return runner, bot, handled
+
+
+async def post_updates(url: str, secret: str, updates: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret}
+
+    async with aiohttp.ClientSession() as session:
+        async def post(update_id):
+            async with semaphore:
+                started = time.perf_counter()
+                async with session.post(url, json=synthetic_update(update_id), headers=headers) as response:
+                    await response.read()
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[post(update_id) for update_id in range(1, updates + 1)])
+        elapsed = time.perf_counter() - started
+
+    return elapsed, sorted(latencies), statuses
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Post synthetic Telegram updates to the webhook")
+    parser.add_argument("--url", help="webhook URL of a running bot; default: an in-process server")
+    parser.add_argument("--secret", default="load-test-secret", help="X-Telegram-Bot-Api-Secret-Token to send")
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--max-in-flight", type=int, default=40, help="in-process server only")
+    parser.add_argument("--handler-ms", type=float, default=20, help="simulated handler time, in-process only")
+    parser.add_argument("--port", type=int, default=8091, help="in-process server port")
+    args = parser.parse_args()
+
+    runner = bot = handled = None
+    url = args.url
+    if not url:
+        runner, bot, handled = await start_local_server(args)
+        url = f"http://127.0.0.1:{args.port}{LOCAL_PATH}"
+
+    try:
+        elapsed, latencies, statuses = await post_updates(url, args.secret, args.updates, args.concurrency)
+    finally:
+        if runner:
+            await runner.cleanup()
+            await bot.session.close()
+
+    print(f"{args.updates} updates, concurrency {args.concurrency}: {elapsed:.2f}s, "
+          f"{args.updates / elapsed:.0f} updates/s")
+    print(f"statuses: {statuses}")
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    if handled is not None:
+        print(f"handled: {len(handled)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Bulk export/import of users, reminders and tags with Postgres COPY.
+
+    python bulk_transfer.py export --dir ./dump [--chat-id 123 --chat-id 456]
+    python bulk_transfer.py import --dir ./dump [--dry-run] [--job-batch-size 500]
+
+Each table is streamed to/from `<dir>/<table>.csv`. Imported rows are merged by
+natural key (users.chat_id, tags.name), so dumps can be loaded into an
+environment that already has some of the same users or tags. After a real
+import the scheduler jobs of the imported active reminders are rebuilt in batches.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytz
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+from psycopg2 import sql
+from sqlalchemy import create_engine, inspect
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config.settings import Settings
+
+TABLES = ["users", "tags", "schedules", "events", "event_tags"]
+
+# Rows belonging to the selected users; %(chat_ids)s is only substituted when filtering
+EXPORT_QUERIES = {
+    "users": "SELECT u.* FROM users u {user_filter}",
+    "tags": """SELECT DISTINCT t.* FROM tags t
+               JOIN event_tags et ON et.tag_id = t.id
+               JOIN events e ON e.id = et.event_id
+               JOIN users u ON u.id = e.user_id {user_filter}""",
+    "schedules": """SELECT s.* FROM schedules s
+                    JOIN events e ON e.schedule_id = s.id
+                    JOIN users u ON u.id = e.user_id {user_filter}""",
+    "events": "SELECT e.* FROM events e JOIN users u ON u.id = e.user_id {user_filter}",
+    "event_tags": """SELECT et.* FROM event_tags et
+                     JOIN events e ON e.id = et.event_id
+                     JOIN users u ON u.id = e.user_id {user_filter}""",
+}
+
+# Staged rows are remapped onto existing users/tags matched by natural key
+MERGE_QUERIES = {
+    "users": """INSERT INTO users SELECT * FROM stage_users
+                ON CONFLICT DO NOTHING""",
+    "tags": """INSERT INTO tags SELECT * FROM stage_tags
+               ON CONFLICT DO NOTHING""",
+    "schedules": """INSERT INTO schedules SELECT * FROM stage_schedules
+                    ON CONFLICT DO NOTHING""",
+    "events": """INSERT INTO events (id, user_id, schedule_id, event_name, description, status,
+                                     created_at, updated_at, google_event_id)
+                 SELECT e.id, u.id, e.schedule_id, e.event_name, e.description, e.status,
+                        e.created_at, e.updated_at, e.google_event_id
+                 FROM stage_events e
+                 JOIN stage_users su ON su.id = e.user_id
+                 JOIN users u ON u.chat_id = su.chat_id
+                 JOIN schedules s ON s.id = e.schedule_id
+                 ON CONFLICT DO NOTHING
+                 RETURNING id""",
+    "event_tags": """INSERT INTO event_tags (event_id, tag_id)
+                     SELECT et.event_id, t.id
+                     FROM stage_event_tags et
+                     JOIN stage_tags st ON st.id = et.tag_id
+                     JOIN tags t ON t.name = st.name
+                     JOIN events e ON e.id = et.event_id
+                     ON CONFLICT DO NOTHING""",
+}
+
+IMPORTED_REMINDERS_QUERY = """
+    SELECT u.chat_id, u.timezone, e.event_name, e.description, s.job_id, s.scheduled_time, s.rrule
+    FROM events e
+    JOIN schedules s ON s.id = e.schedule_id
+    JOIN users u ON u.id = e.user_id
+    WHERE e.id = ANY(%(event_ids)s::uuid[]) AND e.status = 'active'
+"""
+
+
+def get_db_url(settings: Settings) -> str:
+    return (f"postgresql+psycopg2://{settings.db_user}:{settings.db_password}"
+            f"@{settings.db_host}:{settings.db_port}/{settings.db_name}")
+
+
+def report(table: str, action: str, rows: int, started: float):
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    print(f"✅ {action} {rows} rows from {table} in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+def export_data(engine, directory: str, chat_ids: list):
+    os.makedirs(directory, exist_ok=True)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        user_filter = ""
+        if chat_ids:
+            user_filter = cursor.mogrify("WHERE u.chat_id = ANY(%s)", (chat_ids,)).decode()
+
+        for table in TABLES:
+            started = time.perf_counter()
+            query = EXPORT_QUERIES[table].format(user_filter=user_filter)
+            with open(os.path.join(directory, f"{table}.csv"), "w", encoding="utf-8", newline="") as f:
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+            report(table, "Exported", cursor.rowcount, started)
+    finally:
+        connection.close()
+
+
+def read_header(f, table: str, table_columns: set) -> list:
+    """Column names from a CSV header line, checked against the target table before they reach the COPY statement"""
+    header = next(csv.reader([f.readline()]), [])
+    unknown = [column for column in header if column not in table_columns]
+    if not header or unknown or len(set(header)) != len(header):
+        raise ValueError(f"Invalid header in {table}.csv: {header!r} (unknown columns: {unknown!r})")
+    return header
+
+
+def import_data(engine, directory: str, dry_run: bool) -> list:
+    """Stage each CSV with COPY, merge into the live tables and return imported event ids"""
+    inspector = inspect(engine)
+    table_columns = {table: {column['name'] for column in inspector.get_columns(table)} for table in TABLES}
+    connection = engine.raw_connection()
+    imported_event_ids = []
+    try:
+        cursor = connection.cursor()
+        for table in TABLES:
+            cursor.execute(f"CREATE TEMP TABLE stage_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+
+        for table in TABLES:
+            started = time.perf_counter()
+            with open(os.path.join(directory, f"{table}.csv"), "r", encoding="utf-8") as f:
+                header = read_header(f, table, table_columns[table])
+                copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+                    sql.Identifier(f"stage_{table}"), sql.SQL(", ").join(map(sql.Identifier, header))
+                )
+                cursor.copy_expert(copy, f)
+            staged = cursor.rowcount
+
+            cursor.execute(MERGE_QUERIES[table])
+            if table == "events":
+                imported_event_ids = [str(row[0]) for row in cursor.fetchall()]
+            report(table, "Imported", cursor.rowcount, started)
+            if staged != cursor.rowcount:
+                print(f"⏭️  Skipped {staged - cursor.rowcount} {table} rows that already exist or have no parent")
+
+        if dry_run:
+            connection.rollback()
+            print("🔍 Dry run: all changes rolled back")
+            return []
+
+        connection.commit()
+        return imported_event_ids
+
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+def rebuild_jobs(engine, db_url: str, settings: Settings, event_ids: list, batch_size: int):
+    """Recreate the scheduler jobs of imported active reminders in batches"""
+    from scripts.bot_handlers import build_reminder_job_kwargs, send_reminder
+
+    if not event_ids:
+        print("⏭️  No imported reminders need scheduler jobs")
+        return
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(IMPORTED_REMINDERS_QUERY, {"event_ids": event_ids})
+        reminders = cursor.fetchall()
+    finally:
+        connection.close()
+
+    scheduler = BackgroundScheduler(jobstores={'default': SQLAlchemyJobStore(url=db_url)},
+                                    timezone=settings.timezone)
+    scheduler.start(paused=True)
+
+    started = time.perf_counter()
+    now_utc = datetime.now(pytz.utc)
+    scheduled = 0
+    try:
+        for offset in range(0, len(reminders), batch_size):
+            for chat_id, timezone, event_name, description, job_id, scheduled_time, rrule in \
+                    reminders[offset:offset + batch_size]:
+                scheduled_time_utc = pytz.utc.localize(scheduled_time)
+                if not rrule and scheduled_time_utc <= now_utc:
+                    continue
+
+                job_kwargs = build_reminder_job_kwargs(
+                    settings.telegram_bot_token, chat_id, event_name, description,
+                    job_id, scheduled_time_utc, pytz.timezone(timezone), rrule
+                )
+                scheduler.add_job(send_reminder, replace_existing=True, **job_kwargs)
+                scheduled += 1
+            print(f"📅 Scheduled {scheduled} jobs so far")
+    finally:
+        scheduler.shutdown(wait=False)
+
+    report("scheduler", "Rebuilt jobs for", scheduled, started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk export/import reminders with Postgres COPY")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export users, reminders and tags to CSV")
+    export_parser.add_argument("--dir", required=True, help="Output directory")
+    export_parser.add_argument("--chat-id", type=int, action="append", default=[],
+                               help="Only export this user (repeatable)")
+
+    import_parser = subparsers.add_parser("import", help="Import a previous export")
+    import_parser.add_argument("--dir", required=True, help="Directory with the exported CSV files")
+    import_parser.add_argument("--dry-run", action="store_true", help="Roll back instead of committing")
+    import_parser.add_argument("--job-batch-size", type=int, default=500,
+                               help="Scheduler jobs to rebuild per batch")
+
+    args = parser.parse_args()
+
+    settings = Settings()
+    db_url = get_db_url(settings)
+    engine = create_engine(db_url)
+    print(f"✅ Connected to database: {settings.db_name}")
+
+    if args.command == "export":
+        export_data(engine, args.dir, args.chat_id)
+    else:
+        event_ids = import_data(engine, args.dir, args.dry_run)
+        if not args.dry_run:
+            rebuild_jobs(engine, db_url, settings, event_ids, args.job_batch_size)
+
+    print("🎉 Done")
+
+
+if __name__ == "__main__":
+    main()
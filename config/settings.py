@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
@@ -34,6 +35,63 @@ class Settings(BaseSettings):
     timezone: str = "UTC"
     log_level: str = "INFO"
 
+    # Telegram update delivery: "polling" or "webhook"
+    bot_mode: str = "polling"
+    webhook_base_url: Optional[str] = None
+    webhook_path: str = "/telegram/webhook"
+    webhook_secret: Optional[str] = None
+    webhook_listen_host: str = "0.0.0.0"
+    webhook_listen_port: int = 8081
+    webhook_max_in_flight: int = 40
+
+    # Updates handled concurrently across chats (each chat is processed in order)
+    update_concurrency_limit: int = 64
+
+    # Duplicate update suppression
+    dedup_cache_size: int = 10000
+    dedup_use_db: bool = False
+    dedup_ttl_hours: int = 48
+
+    # Background refresh of Google access tokens that are about to expire
+    google_token_refresh_window_minutes: int = 15
+    google_token_refresh_interval_minutes: int = 5
+    google_token_refresh_batch_size: int = 10
+    google_token_refresh_max_per_run: int = 500
+    google_token_refresh_max_backoff_minutes: int = 360
+
+    # OAuth web service: threads for the blocking code exchange/token writes (also the DB pool size)
+    web_worker_threads: int = 8
+
+    # Google endpoints; override to point the calendar client at a local fake server
+    google_token_uri: str = "https://oauth2.googleapis.com/token"
+    google_calendar_api_base: str = "https://www.googleapis.com/calendar/v3"
+    google_calendar_batch_url: str = "https://www.googleapis.com/batch/calendar/v3"
+    # How often the bot and the web service log Calendar call counts and latencies
+    calendar_metrics_log_minutes: int = 5
+
+    # Backfill of existing reminders after a user connects Google Calendar
+    google_backfill_page_size: int = 50
+    google_backfill_batch_interval_seconds: float = 1.0
+
+    # Background propagation of cancellations and edits to Google Calendar
+    calendar_sync_workers: int = 2
+    calendar_sync_user_interval_seconds: float = 1.0
+    calendar_sync_max_attempts: int = 5
+
+    # Incremental pull of changes made directly in Google Calendar
+    google_sync_interval_minutes: int = 5
+    google_sync_concurrency: int = 5
+    google_sync_max_users_per_run: int = 500
+
+    # Read-only handler paths: optional replica URL, otherwise a separate pool on the primary
+    db_replica_url: Optional[str] = None
+    db_read_pool_size: int = 5
+
+    # Retention of completed/cancelled reminders
+    archive_retention_days: int = 30
+    archive_batch_size: int = 500
+    archive_interval_minutes: int = 60
+
     # The modern way to do validation in Pydantic v2
     @field_validator('telegram_bot_token', 'gemini_api_key')
     @classmethod
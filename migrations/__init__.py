@@ -0,0 +1,87 @@
+"""
+Versioned schema migrations.
+
+Each module in `migrations/versions` is named `<version>_<name>.py` and defines
+`upgrade(conn)`. Modules that set `transactional = False` run on an autocommit
+connection, which is required for `CREATE INDEX CONCURRENTLY`. Applied versions
+are recorded in the `schema_migrations` table.
+"""
+import importlib
+import logging
+import pkgutil
+from typing import List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from migrations import versions
+
+# Arbitrary key so only one process (bot or web) migrates at a time
+_ADVISORY_LOCK_KEY = 4727301
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+"""
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    module: object
+
+
+def load_migrations() -> List[Migration]:
+    """Return all migrations in version order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        version, _, name = module_info.name.partition("_")
+        if not version.isdigit():
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(int(version), name, module))
+
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def get_applied_versions(engine: Engine) -> set:
+    with engine.begin() as conn:
+        conn.execute(text(_CREATE_VERSION_TABLE))
+        return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def get_pending_migrations(engine: Engine) -> List[Migration]:
+    applied = get_applied_versions(engine)
+    return [migration for migration in load_migrations() if migration.version not in applied]
+
+
+def _apply(engine: Engine, migration: Migration):
+    record = text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)")
+    params = {"version": migration.version, "name": migration.name}
+
+    if getattr(migration.module, "transactional", True):
+        with engine.begin() as conn:
+            migration.module.upgrade(conn)
+            conn.execute(record, params)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            migration.module.upgrade(conn)
+            conn.execute(record, params)
+
+
+def run_migrations(engine: Engine) -> int:
+    """Apply pending migrations in order. Returns the number applied."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+        try:
+            # Re-read under the lock in case another process just migrated
+            pending = get_pending_migrations(engine)
+            for migration in pending:
+                logging.info(f"Applying migration {migration.version:04d}_{migration.name}")
+                _apply(engine, migration)
+            return len(pending)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
@@ -0,0 +1,6 @@
+"""Create any missing tables from the models"""
+from scripts.models import Base
+
+
+def upgrade(conn):
+    Base.metadata.create_all(conn)
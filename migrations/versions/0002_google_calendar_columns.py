@@ -0,0 +1,12 @@
+"""Add Google Calendar token columns to users"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text("""
+        ALTER TABLE users
+            ADD COLUMN IF NOT EXISTS google_access_token TEXT,
+            ADD COLUMN IF NOT EXISTS google_refresh_token TEXT,
+            ADD COLUMN IF NOT EXISTS google_calendar_id VARCHAR(255),
+            ADD COLUMN IF NOT EXISTS google_token_expires_at TIMESTAMP
+    """))
@@ -0,0 +1,6 @@
+"""Add google_event_id to events"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE events ADD COLUMN IF NOT EXISTS google_event_id VARCHAR(255)"))
@@ -0,0 +1,18 @@
+"""Partial indexes for the reminder list/cancel and retention queries"""
+from sqlalchemy import text
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+transactional = False
+
+INDEXES = [
+    ("ix_events_user_id_active", "events (user_id) WHERE status = 'active'"),
+    ("ix_events_finished_updated_at", "events (updated_at) WHERE status IN ('completed', 'cancelled')"),
+]
+
+
+def upgrade(conn):
+    for index_name, definition in INDEXES:
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {definition}"))
+
+    conn.execute(text("ANALYZE events"))
+    conn.execute(text("ANALYZE schedules"))
@@ -0,0 +1,6 @@
+"""Table of handled Telegram update ids for duplicate suppression"""
+from scripts.models import ProcessedUpdate
+
+
+def upgrade(conn):
+    ProcessedUpdate.__table__.create(conn, checkfirst=True)
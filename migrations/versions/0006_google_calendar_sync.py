@@ -0,0 +1,14 @@
+"""Per-user calendar sync state and the index used to map calendar changes to events"""
+from sqlalchemy import text
+
+# CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+transactional = False
+
+
+def upgrade(conn):
+    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS google_sync_token TEXT"))
+    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS google_synced_at TIMESTAMP WITHOUT TIME ZONE"))
+    conn.execute(text(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_events_user_id_google_event_id "
+        "ON events (user_id, google_event_id) WHERE google_event_id IS NOT NULL"
+    ))
@@ -0,0 +1,9 @@
+"""Failure count and back-off deadline for the background Google token refresh"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text(
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS google_token_refresh_failures INTEGER NOT NULL DEFAULT 0"
+    ))
+    conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS google_token_retry_after TIMESTAMP WITHOUT TIME ZONE"))
@@ -1,4 +1,3 @@
-import math
 import tempfile
 import os
 import uuid
@@ -6,8 +5,9 @@ import logging
 import pytz
 from scripts import database_crud as db
 
-from datetime import datetime, timedelta, time, date
+from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from dateutil.rrule import rrulestr, MINUTELY, HOURLY, DAILY, WEEKLY, MONTHLY
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters import Command
@@ -16,18 +16,26 @@ from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from aiogram.client.bot import DefaultBotProperties
 from aiogram.enums import ParseMode
 
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session
 
-from scripts.database_crud import add_google_event_id_to_events
 from scripts.dependincies import BotDependencies
 from scripts.models import Users, Event
-from utils.filters import TranslatedText
+from utils.filters import TranslatedButton
 from utils.language_manager import LanguageManager
 from utils.utils import convert_to_json, create_human_readable_rule, safe_timezone_convert, adjust_datetime_if_needed
 
 SESSION_FACTORY = None
+LANGUAGE_MANAGER = None
 ITEMS_PER_PAGE = 6
+LIST_ITEMS_LIMIT = 30
+SUPPORTED_LANGUAGES = ("en", "uz", "ru")
+BUTTON_ROUTE_KEYS = ("buttons.help", "buttons.list_reminders", "buttons.cancel_reminders", "buttons.settings")
+_EPOCH = datetime(1970, 1, 1)
 
+
+# Static keyboards are immutable once built, so they are memoized and shared across replies
+@lru_cache(maxsize=None)
 def get_language_keyboard():
     builder = InlineKeyboardBuilder()
     builder.add(
@@ -39,6 +47,7 @@ def get_language_keyboard():
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def get_timezone_keyboard():
     builder = InlineKeyboardBuilder()
     builder.add(
@@ -49,12 +58,14 @@ def get_timezone_keyboard():
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def share_phone_button(text: str):
     builder = ReplyKeyboardBuilder()
     builder.button(text=text, request_contact=True)
     return builder.as_markup(resize_keyboard=True, one_time_keyboard=True)
 
 
+@lru_cache(maxsize=None)
 def get_main_buttons(lm: LanguageManager, lang: str):
     builder = ReplyKeyboardBuilder()
     builder.button(text=lm.get_string("buttons.list_reminders", lang))
@@ -63,6 +74,8 @@ def get_main_buttons(lm: LanguageManager, lang: str):
     builder.adjust(2, 1)
     return builder.as_markup(resize_keyboard=True)
 
+
+@lru_cache(maxsize=None)
 def get_settings_inline_buttons(lm: LanguageManager, lang: str):
     builder = InlineKeyboardBuilder()
     builder.add(
@@ -74,12 +87,14 @@ def get_settings_inline_buttons(lm: LanguageManager, lang: str):
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def get_burger_menu_keyboard():
     builder = ReplyKeyboardBuilder()
     builder.button(text="☰ Menu")
     return builder.as_markup()
 
 
+@lru_cache(maxsize=None)
 def get_main_inline_menu(lm: LanguageManager, lang: str):
     builder = InlineKeyboardBuilder()
     builder.add(
@@ -92,35 +107,55 @@ def get_main_inline_menu(lm: LanguageManager, lang: str):
     return builder.as_markup()
 
 
-def create_cancellation_keyboard(reminders: list, page:int):
-    """creates an inline keyboard for a specific page of reminders to be cancelled."""
+def warm_keyboard_cache(lm: LanguageManager, languages=SUPPORTED_LANGUAGES):
+    """Builds the static keyboards for every language up front."""
+    get_language_keyboard()
+    get_timezone_keyboard()
+    for lang in languages:
+        get_main_buttons(lm, lang)
+        get_settings_inline_buttons(lm, lang)
+        get_main_inline_menu(lm, lang)
+        share_phone_button(lm.get_string("buttons.share_phone", lang))
+
+
+def encode_page_cursor(event: Event) -> str:
+    """Encodes an event's (scheduled_time, id) sort key to fit in callback data."""
+    scheduled_time = event.schedule.scheduled_time
+    if scheduled_time.tzinfo is not None:
+        scheduled_time = scheduled_time.astimezone(pytz.utc).replace(tzinfo=None)
+    micros = (scheduled_time - _EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{event.id.hex}"
 
-    builder = InlineKeyboardBuilder()
-    start_index = page * ITEMS_PER_PAGE
-    end_index = start_index + ITEMS_PER_PAGE
 
-    paginated_reminders = reminders[start_index:end_index]
+def decode_page_cursor(cursor: str) -> tuple:
+    micros, event_id = cursor.split("_", 1)
+    return _EPOCH + timedelta(microseconds=int(micros)), uuid.UUID(hex=event_id)
 
-    for event in paginated_reminders:
+
+def create_cancellation_keyboard(reminders: list, has_previous: bool, has_next: bool):
+    """creates an inline keyboard for a page of reminders to be cancelled."""
+
+    builder = InlineKeyboardBuilder()
+
+    for event in reminders:
         button_text = f"❌ {event.event_name[:40]}" # Truncate for readability
         builder.add(InlineKeyboardButton(text=button_text, callback_data=f"cancel_{event.schedule.job_id}"))
 
     control_buttons = []
-    total_pages = math.ceil(len(reminders) / ITEMS_PER_PAGE)
 
-    if page > 0:
+    if has_previous and reminders:
         control_buttons.append(
             InlineKeyboardButton(
                 text="⬅️",
-                callback_data=f"page_cancel_{page-1}" # go to the previous page
+                callback_data=f"page_cancel_p_{encode_page_cursor(reminders[0])}" # go to the previous page
             )
         )
 
-    if end_index < len(reminders):
+    if has_next and reminders:
         control_buttons.append(
             InlineKeyboardButton(
                 text="➡️",
-                callback_data=f"page_cancel_{page+1}" # go to the next page
+                callback_data=f"page_cancel_n_{encode_page_cursor(reminders[-1])}" # go to the next page
             )
         )
 
@@ -132,7 +167,6 @@ def create_cancellation_keyboard(reminders: list, page:int):
     return builder.as_markup()
 
 
-
 @asynccontextmanager
 async def get_db_session(session_factory: sessionmaker) -> Session:
     session = session_factory()
@@ -146,6 +180,31 @@ async def get_db_session(session_factory: sessionmaker) -> Session:
         session.close()
 
 
+@asynccontextmanager
+async def get_read_db_session(deps: BotDependencies) -> Session:
+    """
+    Session for read-only handler paths. Uses the read pool (replica or a separate
+    pool on the primary) and falls back to the primary when it is unavailable.
+    """
+    session_factory = deps.read_session_factory or deps.session_factory
+    session = session_factory()
+    try:
+        if session_factory is not deps.session_factory:
+            try:
+                session.connection()
+            except OperationalError as e:
+                logging.warning(f"Read database unavailable, falling back to primary: {e}")
+                session.close()
+                session = deps.session_factory()
+        yield session
+    except Exception as e:
+        logging.error(f"Database session error: {e}")
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
 async def send_reminder(bot_token: str, chat_id: int, event_name: str,
                         event_description: str, job_id: str):
     """
@@ -153,39 +212,41 @@ async def send_reminder(bot_token: str, chat_id: int, event_name: str,
     """
     logging.info(f"Executing job {job_id} to send reminder to chat {chat_id}")
     bot = Bot(token=bot_token, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
-    lm = LanguageManager()
+    lm = LANGUAGE_MANAGER or LanguageManager()
     try:
         async with get_db_session(SESSION_FACTORY) as session:
-            event = db.get_event_by_job_id(session, job_id)
+            reminder = db.get_reminder_firing_context(session, job_id)
             status = "complete"
+            next_run_utc = None
 
-            if not event:
+            if not reminder:
                 logging.warning(f"Could not find event for job {job_id} after sending reminder.")
                 return
 
-            reminder_text = lm.get_string("reminders.reminder_notification", event.user.language, event_name=event_name,
-                                          event_description=event_description)
+            reminder_text = lm.get_string("reminders.reminder_notification", reminder.language,
+                                          event_name=reminder.event_name,
+                                          event_description=reminder.description)
 
-            await bot.send_message(chat_id=chat_id, text=reminder_text,
-                                   reply_markup=get_main_buttons(lm, event.user.language))
+            await bot.send_message(chat_id=reminder.chat_id, text=reminder_text,
+                                   reply_markup=get_main_buttons(lm, reminder.language))
 
-            if event.schedule and event.schedule.rrule:
+            if reminder.rrule:
                 try:
                     utc = pytz.utc
-                    user_tz = pytz.timezone(event.user.timezone)
+                    user_tz = pytz.timezone(reminder.timezone)
                     # get current time in utc
                     now_utc = datetime.now(utc)
 
                     # get original scheduled time in user's timezone
-                    if event.schedule.scheduled_time.tzinfo is None:
-                        scheduled_time_utc = utc.localize(event.schedule.scheduled_time)
+                    if reminder.scheduled_time.tzinfo is None:
+                        scheduled_time_utc = utc.localize(reminder.scheduled_time)
                     else:
-                        scheduled_time_utc = event.schedule.scheduled_time.astimezone(utc)
+                        scheduled_time_utc = reminder.scheduled_time.astimezone(utc)
 
                     # convert to user timezone for rrule calculation
                     scheduled_time_local = scheduled_time_utc.astimezone(user_tz)
                     # parse rrule with local time as dtstart
-                    rule = rrulestr(event.schedule.rrule, dtstart=scheduled_time_local)
+                    rule = rrulestr(reminder.rrule, dtstart=scheduled_time_local)
 
                     # find next occurrence after current time in user timezone
                     now_local = now_utc.astimezone(user_tz)
@@ -196,7 +257,6 @@ async def send_reminder(bot_token: str, chat_id: int, event_name: str,
                     if next_run_local:
                         next_run_utc = next_run_local.astimezone(utc)
                         status = "ongoing"
-                        db.update_schedule_run_date(session, job_id, next_run_utc)
                         logging.info(
                             f"Next run for job {job_id} scheduled at {next_run_utc} UTC ({next_run_utc} {user_tz.zone})")
                     else:
@@ -205,7 +265,7 @@ async def send_reminder(bot_token: str, chat_id: int, event_name: str,
                 except Exception as e:
                     logging.error(f"Error calculating next run time for job {job_id}: {e}")
 
-            db.update_event_status(session, job_id, status)
+            db.update_event_status(session, job_id, status, next_run_utc)
 
         logging.info(f"Successfully sent reminder for job {job_id}")
 
@@ -215,6 +275,92 @@ async def send_reminder(bot_token: str, chat_id: int, event_name: str,
         await bot.session.close()
 
 
+def is_supported_rrule(rrule_str: str) -> bool:
+    """
+    Whether build_reminder_job_kwargs can turn the rule into an equivalent trigger:
+    DAILY, WEEKLY (plain BYDAY, a single day when INTERVAL > 1) or MONTHLY by
+    BYMONTHDAY every month. Rules from elsewhere (e.g. Google Calendar) must be checked first.
+    """
+    try:
+        parts = dict(part.split('=', 1) for part in rrule_str.upper().split(';') if part)
+        freq = parts.get('FREQ')
+        interval = int(parts.get('INTERVAL', '1'))
+        by_day = [day for day in parts.get('BYDAY', '').split(',') if day]
+    except ValueError:
+        return False
+
+    if set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'BYMONTHDAY', 'WKST'} or interval < 1:
+        return False
+    if freq == 'DAILY':
+        return not by_day and 'BYMONTHDAY' not in parts
+    if freq == 'WEEKLY':
+        plain_days = all(day in ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU') for day in by_day)
+        return plain_days and 'BYMONTHDAY' not in parts and (interval == 1 or len(by_day) <= 1)
+    if freq == 'MONTHLY':
+        return interval == 1 and not by_day
+    return False
+
+
+def build_reminder_job_kwargs(bot_token: str, chat_id: int, event_name: str, event_description: str,
+                              job_id: str, reminder_time_utc: datetime, user_timezone: pytz.BaseTzInfo,
+                              rrule_str: str = None) -> dict:
+    """Builds the APScheduler add_job kwargs (trigger, args, id) for a reminder."""
+    # ensure reminder_time_utc is timezone-aware
+    if reminder_time_utc.tzinfo is None:
+        reminder_time_utc = pytz.utc.localize(reminder_time_utc)
+    elif reminder_time_utc.tzinfo != pytz.utc:
+        reminder_time_utc = reminder_time_utc.astimezone(pytz.utc)
+
+    job_kwargs = {
+        'id': job_id,
+        'args': [bot_token, chat_id, event_name, event_description, job_id]
+    }
+    if rrule_str:
+        logging.info(f"Parsing rrule '{rrule_str}' to create a recurring job.")
+
+        # convert to user timezone for rrule parsing
+        reminder_time_local = reminder_time_utc.astimezone(user_timezone)
+        rule = rrulestr(rrule_str, dtstart=reminder_time_local)
+
+        # Logic to decide between 'interval' and 'cron' triggers
+        # If an interval is specified, use the 'interval' trigger.
+        if rule._interval > 1:
+            job_kwargs['trigger'] = 'interval'
+            interval_kwargs = {'start_date': reminder_time_utc}  # APScheduler expects UTC
+            if rule._freq == MINUTELY:
+                interval_kwargs['minutes'] = rule._interval
+            elif rule._freq == HOURLY:
+                interval_kwargs['hours'] = rule._interval
+            elif rule._freq == DAILY:
+                interval_kwargs['days'] = rule._interval
+            elif rule._freq == WEEKLY:
+                interval_kwargs['weeks'] = rule._interval
+            job_kwargs.update(interval_kwargs)
+        else:
+            # If no interval, use the more specific 'cron' trigger with timezone specification.
+            job_kwargs['trigger'] = 'cron'
+            cron_args = {
+                'hour': reminder_time_local.hour,  # user local time for cron
+                'minute': reminder_time_local.minute,
+                'start_date': reminder_time_utc,  # but start date in utc
+                'timezone': user_timezone  # specify timezone for cron
+            }
+
+            if rule._freq == WEEKLY:
+                day_map = {0: 'mon', 1: 'tue', 2: 'wed', 3: 'thu', 4: 'fri', 5: 'sat', 6: 'sun'}
+                cron_args['day_of_week'] = ','.join([day_map[d] for d in rule._byweekday])
+            elif rule._freq == MONTHLY:
+                cron_args['day'] = ','.join(map(str, rule._bymonthday))
+            # For DAILY, just hour/minute is needed, which is already set.
+            job_kwargs.update(cron_args)
+    else:
+        # Fallback for one-time jobs
+        job_kwargs['trigger'] = 'date'
+        job_kwargs['run_date'] = reminder_time_utc  # APScheduler expects UTC
+
+    return job_kwargs
+
+
 class BotHandlers:
     def __init__(self, deps: BotDependencies):
         self.deps = deps
@@ -226,64 +372,12 @@ class BotHandlers:
             job_id = str(uuid.uuid4())
             rrule_str = data.get("rrule")
 
-            # ensure reminder_time_utc is timezone-aware
-            if reminder_time_utc.tzinfo is None:
-                reminder_time_utc = pytz.utc.localize(reminder_time_utc)
-            elif reminder_time_utc.tzinfo != pytz.utc:
-                reminder_time_utc = reminder_time_utc.astimezone(pytz.utc)
-
-            job_kwargs = {
-                'id': job_id,
-                'args': [
-                    self.deps.bot.token,
-                    chat_id,
-                    data.get("event_name", "Untitled Event"),
-                    data.get("event_description", "No details provided."),
-                    job_id
-                ]
-            }
-            if rrule_str:
-                logging.info(f"Parsing rrule '{rrule_str}' to create a recurring job.")
-
-                # convert to user timezone for rrule parsing
-                reminder_time_local = reminder_time_utc.astimezone(user_timezone)
-                rule = rrulestr(rrule_str, dtstart=reminder_time_local)
-
-                # Logic to decide between 'interval' and 'cron' triggers
-                # If an interval is specified, use the 'interval' trigger.
-                if rule._interval > 1:
-                    job_kwargs['trigger'] = 'interval'
-                    interval_kwargs = {'start_date': reminder_time_utc}  # APScheduler expects UTC
-                    if rule._freq == MINUTELY:
-                        interval_kwargs['minutes'] = rule._interval
-                    elif rule._freq == HOURLY:
-                        interval_kwargs['hours'] = rule._interval
-                    elif rule._freq == DAILY:
-                        interval_kwargs['days'] = rule._interval
-                    elif rule._freq == WEEKLY:
-                        interval_kwargs['weeks'] = rule._interval
-                    job_kwargs.update(interval_kwargs)
-                else:
-                    # If no interval, use the more specific 'cron' trigger with timezone specification.
-                    job_kwargs['trigger'] = 'cron'
-                    cron_args = {
-                        'hour': reminder_time_local.hour,  # user local time for cron
-                        'minute': reminder_time_local.minute,
-                        'start_date': reminder_time_utc,  # but start date in utc
-                        'timezone': user_timezone  # specify timezone for cron
-                    }
-
-                    if rule._freq == WEEKLY:
-                        day_map = {0: 'mon', 1: 'tue', 2: 'wed', 3: 'thu', 4: 'fri', 5: 'sat', 6: 'sun'}
-                        cron_args['day_of_week'] = ','.join([day_map[d] for d in rule._byweekday])
-                    elif rule._freq == MONTHLY:
-                        cron_args['day'] = ','.join(map(str, rule._bymonthday))
-                    # For DAILY, just hour/minute is needed, which is already set.
-                    job_kwargs.update(cron_args)
-            else:
-                # Fallback for one-time jobs
-                job_kwargs['trigger'] = 'date'
-                job_kwargs['run_date'] = reminder_time_utc  # APScheduler expects UTC
+            job_kwargs = build_reminder_job_kwargs(
+                self.deps.bot.token, chat_id,
+                data.get("event_name", "Untitled Event"),
+                data.get("event_description", "No details provided."),
+                job_id, reminder_time_utc, user_timezone, rrule_str
+            )
 
             self.deps.scheduler.add_job(
                 send_reminder,
@@ -291,12 +385,11 @@ class BotHandlers:
             )
 
             async with get_db_session(self.deps.session_factory) as session:
-                tags = db.get_or_create_tags(session, data.get("tags", []))
-                event_id = db.create_full_event(
+                event_id = db.create_reminder(
                     session, user_id, data.get("event_name", "Untitled Event"),
                     data.get("event_description", "No details provided."),
                     reminder_time_utc, job_id, data.get("type"),
-                    data.get("rrule"), tags
+                    data.get("rrule"), data.get("tags", [])
                 )
                 logging.info(f"Scheduled job {job_id} and saved to db")
                 return {'status': True, 'event_id': event_id}
@@ -387,70 +480,16 @@ class BotHandlers:
         """Create Google Calendar event if user has Google Calendar connected"""
         try:
             async with get_db_session(self.deps.session_factory) as session:
-                # Check if user has Google Calendar connected
-                if not db.is_google_calendar_connected(session, chat_id):
-                    return
-                
-                # Get user's Google Calendar tokens
+                # Get user's Google Calendar tokens (None when Calendar is not connected)
                 tokens = db.get_google_tokens(session, chat_id)
                 if not tokens:
                     return
                 
                 access_token = tokens['access_token']
                 
-                # Check if token needs refresh
-                try:
-                    # Ensure both datetimes are timezone-aware for comparison
-                    current_time = datetime.now(pytz.utc)
-                    token_expires = tokens['expires_at']
-                    
-                    # Handle both datetime and date objects
-                    if token_expires:
-                        # Check if it's a date object (not datetime)
-                        if isinstance(token_expires, date) and not isinstance(token_expires, datetime):
-                            # It's a date object, convert to datetime at start of day
-                            token_expires = datetime.combine(token_expires, time.min)
-                        
-                        # Convert token_expires to timezone-aware UTC if it's naive
-                        if not hasattr(token_expires, 'tzinfo') or token_expires.tzinfo is None:
-                            token_expires = pytz.utc.localize(token_expires)
-                        elif token_expires.tzinfo != pytz.utc:
-                            token_expires = token_expires.astimezone(pytz.utc)
-                    
-                    if token_expires and current_time >= token_expires:
-                        # Token expired, try to refresh
-                        from services.g_calendar import refresh_access_token, get_oauth_client_config
-                        
-                        oauth_config = get_oauth_client_config()
-                        if oauth_config and tokens['refresh_token']:
-                            refresh_result = refresh_access_token(
-                                tokens['refresh_token'],
-                                oauth_config['client_id'],
-                                oauth_config['client_secret']
-                            )
-                            
-                            if refresh_result:
-                                # Update the access token in database
-                                db.update_google_access_token(
-                                    session, 
-                                    chat_id, 
-                                    refresh_result['access_token'], 
-                                    refresh_result['expires_at']
-                                )
-                                access_token = refresh_result['access_token']
-                                logging.info(f"Successfully refreshed Google Calendar token for user {chat_id}")
-                            else:
-                                logging.error(f"Failed to refresh Google Calendar token for user {chat_id}")
-                                return
-                        else:
-                            logging.warning(f"Cannot refresh Google Calendar token for user {chat_id} - missing refresh token or client config")
-                            return
-                
-                except Exception as datetime_error:
-                    logging.error(f"Error checking token expiration for user {chat_id}: {datetime_error}")
-                    # Continue with existing token if there's a datetime comparison error
-                    pass
-                
+                # Tokens are refreshed ahead of expiry in the background (services/token_refresher.py);
+                # a token that expired anyway is refreshed by the calendar client on 401.
+
                 # Prepare event data
                 event_name = data.get('event_name', 'Reminder')
                 event_description = data.get('event_description', 'Scheduled reminder from ReminderBot')
@@ -461,12 +500,12 @@ class BotHandlers:
                 end_time_local = remind_time_local + timedelta(minutes=15)
                 
                 # Create the calendar event
-                from services.g_calendar import create_calendar_event, get_oauth_client_config
+                from services.g_calendar import get_oauth_client_config
                 
                 # Get OAuth config for credentials
                 oauth_config = get_oauth_client_config()
                 
-                result = create_calendar_event(
+                result = await self.deps.calendar_client.create_calendar_event(
                     access_token=access_token,
                     event_name=event_name,
                     event_description=event_description,
@@ -481,6 +520,10 @@ class BotHandlers:
                 
                 if result['success']:
                     logging.info(f"Successfully created Google Calendar event for user {chat_id}: {result['event_id']}")
+                    if result.get('refreshed'):
+                        db.update_google_access_token(
+                            session, chat_id, result['refreshed']['access_token'], result['refreshed']['expires_at']
+                        )
                     # Send confirmation message to user
                     try:
                         if result.get('is_recurring', False):
@@ -493,8 +536,7 @@ class BotHandlers:
                             text=confirmation_text
                         )
 
-                        async with get_db_session(self.deps.session_factory) as session:
-                            add_google_event_id_to_events(session, event_id, result['event_id'])
+                        db.add_google_event_id_to_events(session, event_id, result['event_id'])
 
                     except Exception as e:
                         logging.error(f"Failed to send Google Calendar confirmation message: {e}")
@@ -505,7 +547,29 @@ class BotHandlers:
             logging.error(f"Error creating Google Calendar event for user {chat_id}: {e}")
             # Don't let Google Calendar errors break the reminder scheduling
 
+    async def _get_user_for_read(self, session: Session, chat_id: int, first_name: str) -> Users:
+        """Looks the user up on the read session; unknown users are created on the primary."""
+        user = db.get_user_by_chat_id(session, chat_id)
+        if user:
+            return user
+
+        async with get_db_session(self.deps.session_factory) as primary:
+            user = db.get_or_create_user(primary, chat_id, first_name)
+            primary.refresh(user)
+            return user
+
     # --- Message and Callback Handlers as class methods ---
+    async def handle_button(self, message: Message, button_key: str, button_lang: str):
+        """Routes a translated reply-keyboard button to its handler."""
+        routes = {
+            "buttons.help": self.start,
+            "buttons.list_reminders": self.list_reminders,
+            "buttons.cancel_reminders": self.cancel_reminders_list,
+            "buttons.settings": self.settings,
+        }
+        logging.debug(f"Button {button_key} pressed in {button_lang}")
+        await routes[button_key](message)
+
     async def start(self, message: Message):
         async with get_db_session(self.deps.session_factory) as session:
             try:
@@ -561,9 +625,9 @@ class BotHandlers:
             await callback.answer()
 
     async def list_reminders(self, message: Message):
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, message.chat.id, message.from_user.first_name)
-            reminders = db.get_active_reminders_by_user(session, user.id)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, message.chat.id, message.from_user.first_name)
+            reminders, has_more = db.get_active_reminders_page(session, user.id, LIST_ITEMS_LIMIT)
             user_tz = pytz.timezone(user.timezone)
 
         if not reminders:
@@ -573,7 +637,7 @@ class BotHandlers:
 
         response_text = self.deps.lm.get_string("reminders.active_reminders_header",
                                                 user.language,
-                                                reminder_count=len(reminders))
+                                                reminder_count=f"{len(reminders)}+" if has_more else len(reminders))
 
         for event in reminders:
             response_text += f"▪️{event.event_name}\n"
@@ -592,6 +656,8 @@ class BotHandlers:
                     response_text += f"  - 🗓️ {scheduled_time_local.strftime('%Y/%m/%d %H:%M %Z')}\n\n"
             except Exception as e:
                 logging.error(f"List reminder error: {e}, event rrule: {event.schedule.rrule}")
+        if has_more:
+            response_text += self.deps.lm.get_string("reminders.more_reminders", user.language)
         try:
             await self.deps.bot.delete_message(chat_id=message.chat.id, message_id=message.message_id - 1)
         except Exception as e:
@@ -601,9 +667,9 @@ class BotHandlers:
                              reply_markup=get_main_buttons(self.deps.lm, user.language))
 
     async def cancel_reminders_list(self, message: Message):
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, message.chat.id, message.from_user.first_name)
-            reminders = db.get_active_reminders_by_user(session, user.id)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, message.chat.id, message.from_user.first_name)
+            reminders, has_next = db.get_active_reminders_page(session, user.id, ITEMS_PER_PAGE)
 
             try:
                 await self.deps.bot.delete_message(chat_id=message.chat.id, message_id=message.message_id - 1)
@@ -615,7 +681,7 @@ class BotHandlers:
                                  reply_markup=get_main_buttons(self.deps.lm, user.language))
             return
 
-        keyword = create_cancellation_keyboard(reminders, page=0)
+        keyword = create_cancellation_keyboard(reminders, has_previous=False, has_next=has_next)
         await message.answer(self.deps.lm.get_string("cancellation.select_reminder_to_cancel", user.language),
                              reply_markup=keyword,
                              parse_mode="Markdown")
@@ -633,12 +699,14 @@ class BotHandlers:
             except Exception as e:
                 logging.warning(f"Job {job_id} not found in scheduler, might be already completed or removed: {e}")
             db.update_event_status(session, job_id=job_id, status="cancelled")
+            if event.google_event_id and self.deps.calendar_sync:
+                self.deps.calendar_sync.enqueue_cancel(callback.message.chat.id, event.id, event.google_event_id)
 
             await callback.answer(self.deps.lm.get_string("cancellation.cancellation_confirmation", event.user.language, event_name=event.event_name, show_alert=False))
 
-            remaining_events = db.get_active_reminders_by_user(session, user_id=event.user_id)
+            remaining_events, has_next = db.get_active_reminders_page(session, event.user_id, ITEMS_PER_PAGE)
             if remaining_events:
-                updated_keyword = create_cancellation_keyboard(remaining_events, page=0)
+                updated_keyword = create_cancellation_keyboard(remaining_events, has_previous=False, has_next=has_next)
                 await callback.message.edit_reply_markup(reply_markup=updated_keyword)
             else:
                 try:
@@ -654,15 +722,47 @@ class BotHandlers:
 
     async def handle_cancel_pagination(self, callback: CallbackQuery):
         """Handles next and back button clicks for the cancellation list"""
-        page = int(callback.data.split("_")[-1])
+        # callback data: page_cancel_<n|p>_<cursor>
+        parts = callback.data.split("_", 3)[2:]
+        if len(parts) == 2:
+            direction, cursor = parts
+            backward = direction == "p"
+            cursor = decode_page_cursor(cursor)
+        else:
+            # Keyboards sent before keyset pagination carry a page number (page_cancel_<n>): restart at the first page
+            backward, cursor = False, None
 
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, callback.message.chat.id, callback.from_user.first_name)
-            reminders = db.get_active_reminders_by_user(session, user.id)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, callback.message.chat.id, callback.from_user.first_name)
+            reminders, has_more = db.get_active_reminders_page(
+                session, user.id, ITEMS_PER_PAGE, cursor=cursor, backward=backward
+            )
+            if not reminders and cursor is not None:
+                # Everything on the target page was cancelled meanwhile: start over at the first page
+                cursor, backward = None, False
+                reminders, has_more = db.get_active_reminders_page(session, user.id, ITEMS_PER_PAGE)
+
+            if cursor is None:
+                has_previous, has_next = False, has_more
+            elif backward:
+                # A limit of 0 only probes for a row past the page edge in the other direction
+                has_previous = has_more
+                _, has_next = db.get_active_reminders_page(
+                    session, user.id, 0, cursor=(reminders[-1].schedule.scheduled_time, reminders[-1].id)
+                )
+            else:
+                _, has_previous = db.get_active_reminders_page(
+                    session, user.id, 0, cursor=(reminders[0].schedule.scheduled_time, reminders[0].id), backward=True
+                )
+                has_next = has_more
 
         user_lang = user.language
-        new_keyboard = create_cancellation_keyboard(reminders, page=page)
-        total_pages = math.ceil(len(reminders) / ITEMS_PER_PAGE)
+        if not reminders:
+            await callback.message.edit_text(self.deps.lm.get_string("reminders.no_active_reminders", user_lang))
+            await callback.answer()
+            return
+
+        new_keyboard = create_cancellation_keyboard(reminders, has_previous=has_previous, has_next=has_next)
         new_text = f"{self.deps.lm.get_string('cancellation.select_reminder_to_cancel', user_lang)}"
 
         await callback.message.edit_text(text=new_text, reply_markup=new_keyboard, parse_mode='Markdown')
@@ -670,8 +770,8 @@ class BotHandlers:
 
     async def settings(self, message: Message):
         chat_id = message.chat.id
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, chat_id, message.from_user.first_name)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, chat_id, message.from_user.first_name)
             await message.answer(
                 self.deps.lm.get_string("settings.settings_menu", user.language),
                 reply_markup=get_settings_inline_buttons(self.deps.lm, user.language)
@@ -680,8 +780,8 @@ class BotHandlers:
     async def settings_change_language_callback(self, callback: CallbackQuery):
         """Handle inline button click for changing language in settings"""
         chat_id = callback.message.chat.id
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, chat_id, callback.from_user.first_name)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, chat_id, callback.from_user.first_name)
             
         await callback.message.edit_text(
             text=self.deps.lm.get_string("setup.ask_language", user.language),
@@ -692,8 +792,8 @@ class BotHandlers:
     async def settings_change_timezone_callback(self, callback: CallbackQuery):
         """Handle inline button click for changing timezone in settings"""
         chat_id = callback.message.chat.id
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, chat_id, callback.from_user.first_name)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, chat_id, callback.from_user.first_name)
             
         await callback.message.edit_text(
             text=self.deps.lm.get_string("setup.request_timezone", user.language),
@@ -758,8 +858,8 @@ class BotHandlers:
     async def back_to_settings_callback(self, callback: CallbackQuery):
         """Handle back to settings button"""
         chat_id = callback.message.chat.id
-        async with get_db_session(self.deps.session_factory) as session:
-            user = db.get_or_create_user(session, chat_id, callback.from_user.first_name)
+        async with get_read_db_session(self.deps) as session:
+            user = await self._get_user_for_read(session, chat_id, callback.from_user.first_name)
             
         await callback.message.edit_text(
             text=self.deps.lm.get_string("settings.settings_menu", user.language),
@@ -932,17 +1032,19 @@ def register_handlers(dp: Dispatcher, deps: BotDependencies, lm: LanguageManager
     Registers all handlers with proper dependency injection using a class-based approach.
     """
     handlers = BotHandlers(deps)
-    global SESSION_FACTORY
+    global SESSION_FACTORY, LANGUAGE_MANAGER
     if SESSION_FACTORY is None:
         SESSION_FACTORY = deps.session_factory
+    if LANGUAGE_MANAGER is None:
+        LANGUAGE_MANAGER = lm
+
+    warm_keyboard_cache(lm)
 
     dp.message.register(handlers.start, Command("start", "help"))
-    dp.message.register(handlers.start, TranslatedText(lm, "buttons.help"))
     dp.message.register(handlers.list_reminders, Command("list"))
-    dp.message.register(handlers.list_reminders, TranslatedText(lm, "buttons.list_reminders"))
     dp.message.register(handlers.cancel_reminders_list, Command("cancel"))
-    dp.message.register(handlers.cancel_reminders_list, TranslatedText(lm, "buttons.cancel_reminders"))
-    dp.message.register(handlers.settings, TranslatedText(lm, "buttons.settings"))
+    # One hash lookup for every translated reply-keyboard button
+    dp.message.register(handlers.handle_button, TranslatedButton(lm, BUTTON_ROUTE_KEYS))
     dp.message.register(handlers.get_user_contact, F.contact)
     dp.message.register(handlers.handle_text_message, F.text)
     dp.message.register(handlers.handle_voice_message, F.voice)
@@ -3,19 +3,50 @@
 import uuid
 import logging
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy import update, select
+from sqlalchemy import update, select, insert, delete, literal, func, tuple_, lambda_stmt, bindparam, String, Text, \
+    DateTime, UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, contains_eager
 
-from scripts.models import Users, Event, Schedule, Tag
+from scripts.models import Users, Event, Schedule, Tag, event_tags_association, EventArchive, ScheduleArchive, \
+    event_tags_archive, ProcessedUpdate
+from utils.credential_cache import CredentialCache
+
+# Decrypted Google tokens by chat_id; invalidated whenever the stored tokens change
+GOOGLE_CREDENTIALS = CredentialCache(maxsize=10000, ttl=60)
+
+
+def user_by_chat_id_stmt(chat_id: int):
+    """Cached lambda statement for the user lookup by chat_id; only chat_id is re-bound per call"""
+    return lambda_stmt(lambda: select(Users).where(Users.chat_id == chat_id))
+
+
+def reminder_firing_context_stmt(job_id: str):
+    """Cached lambda statement for the columns send_reminder needs; only job_id is re-bound per call"""
+    return lambda_stmt(lambda: select(
+        Users.chat_id,
+        Users.language,
+        Users.timezone,
+        Event.event_name,
+        Event.description,
+        Schedule.rrule,
+        Schedule.scheduled_time
+    ).select_from(Schedule).join(
+        Event, Event.schedule_id == Schedule.id
+    ).join(
+        Users, Users.id == Event.user_id
+    ).where(
+        Schedule.job_id == job_id
+    ))
 
 
 def get_or_create_user(session: Session, chat_id: int, user_name: str) -> Users:
     """Get existing user or create new one"""
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         if user:
@@ -37,10 +68,22 @@ def get_or_create_user(session: Session, chat_id: int, user_name: str) -> Users:
         raise
 
 
+def get_user_by_chat_id(session: Session, chat_id: int) -> Optional[Users]:
+    """Read-only user lookup; safe to run against a replica"""
+    try:
+        stmt = user_by_chat_id_stmt(chat_id)
+        return session.scalars(stmt).first()
+
+    except Exception as e:
+        logging.error(f"Error getting user {chat_id}: {e}")
+        session.rollback()
+        return None
+
+
 def add_user_lang(session: Session, chat_id: int, lang: str):
     """Get existing user's language"""
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
         if user:
             user.language = lang
@@ -70,31 +113,51 @@ def add_user_phone(session: Session, chat_id: int, phone_number: str):
         return None
 
 
-def get_active_reminders_by_user(session: Session, user_id: uuid.UUID) -> List[Event]:
+def get_active_reminders_page(session: Session, user_id: uuid.UUID, limit: int,
+                              cursor: Optional[Tuple[datetime, uuid.UUID]] = None,
+                              backward: bool = False) -> Tuple[List[Event], bool]:
     """
-    FIXED: Get active reminders for a user with proper model names and relationships
+    Keyset-paginated active reminders ordered by (scheduled_time, id).
+
+    `cursor` is the (scheduled_time, event id) of the row the page starts after
+    (or before, when `backward` is set). One extra row is fetched to tell
+    whether another page exists in the requested direction.
     """
     try:
-        # Use the correct singular model names: Event and Schedule
-        reminders = session.query(Event).options(
-            joinedload(Event.schedule)  # Load the schedule relationship
+        sort_key = tuple_(Schedule.scheduled_time, Event.id)
+
+        query = session.query(Event).join(
+            Schedule,
+            Event.schedule_id == Schedule.id
+        ).options(
+            contains_eager(Event.schedule)
         ).filter(
             Event.user_id == user_id,
             Event.status == 'active'
-        ).join(
-            Schedule,  # Use singular Schedule model
-            Event.schedule_id == Schedule.id
-        ).order_by(
-            Schedule.scheduled_time.asc()  # Use singular Schedule model
-        ).all()
+        )
+
+        if backward:
+            if cursor:
+                query = query.filter(sort_key < tuple_(*cursor))
+            query = query.order_by(Schedule.scheduled_time.desc(), Event.id.desc())
+        else:
+            if cursor:
+                query = query.filter(sort_key > tuple_(*cursor))
+            query = query.order_by(Schedule.scheduled_time.asc(), Event.id.asc())
 
-        logging.info(f"Found {len(reminders)} active reminders for user {user_id}")
-        return reminders
+        reminders = query.limit(limit + 1).all()
+        has_more = len(reminders) > limit
+        reminders = reminders[:limit]
+
+        if backward:
+            reminders.reverse()
+
+        return reminders, has_more
 
     except Exception as e:
-        logging.error(f"Failed to get active reminders for user {user_id}: {e}")
+        logging.error(f"Failed to get reminders page for user {user_id}: {e}")
         session.rollback()
-        return []
+        return [], False
 
 
 def get_event_by_job_id(session: Session, job_id: str) -> Optional[Event]:
@@ -116,6 +179,22 @@ def get_event_by_job_id(session: Session, job_id: str) -> Optional[Event]:
         return None
 
 
+def get_reminder_firing_context(session: Session, job_id: str):
+    """
+    Fetch only the columns send_reminder needs, in one round trip.
+
+    Returns a Row with chat_id, language, timezone, event_name, description,
+    rrule and scheduled_time, or None if the job has no schedule.
+    """
+    try:
+        stmt = reminder_firing_context_stmt(job_id)
+        return session.execute(stmt).first()
+    except Exception as e:
+        logging.error(f"Error getting firing context for job_id {job_id}: {e}")
+        session.rollback()
+        return None
+
+
 def get_schedule_by_job_id(session: Session, job_id: str) -> Schedule:
     try:
         schedule = session.query(Schedule).filter(Schedule.job_id == job_id).first()
@@ -126,49 +205,62 @@ def get_schedule_by_job_id(session: Session, job_id: str) -> Schedule:
         return None
 
 
-def update_event_status(session: Session, job_id: str, status: str) -> bool:
-    """Update event status by job_id"""
-    try:
-        # Update the schedule status
-        schedule = session.query(Schedule).filter(Schedule.job_id == job_id).first()
-        if schedule:
-            schedule.status = status
+def _build_status_update_statements():
+    """
+    Status updates run on every reminder fire, so they are built once with bind
+    parameters and re-executed instead of going through the query builder per call.
+    """
+    schedules = Schedule.__table__
+    events = Event.__table__
 
-            # Also update the related event status
-            event = session.query(Event).filter(Event.schedule_id == schedule.id).first()
-            if event:
-                if status == "complete":
-                    event.status = "completed"
-                elif status == "cancelled":
-                    event.status = "cancelled"
+    update_schedule = update(schedules).where(
+        schedules.c.job_id == bindparam('job_id')
+    ).values(
+        status=bindparam('schedule_status'),
+        scheduled_time=func.coalesce(bindparam('next_run_date', type_=DateTime), schedules.c.scheduled_time)
+    ).returning(schedules.c.id)
 
-            session.commit()
-            logging.info(f"Updated status for job {job_id} to {status}")
-            return True
+    updated_schedule = update_schedule.cte("updated_schedule")
+    update_schedule_and_event = update(events).where(
+        events.c.schedule_id == updated_schedule.c.id
+    ).values(status=bindparam('event_status')).returning(events.c.id)
 
-        logging.warning(f"No schedule found for job_id {job_id}")
-        return False
+    return update_schedule, update_schedule_and_event
 
-    except Exception as e:
-        logging.error(f"Error updating status for job {job_id}: {e}")
-        session.rollback()
-        return False
 
+_UPDATE_SCHEDULE, _UPDATE_SCHEDULE_AND_EVENT = _build_status_update_statements()
+
+
+def update_event_status(session: Session, job_id: str, status: str,
+                        next_run_date: Optional[datetime] = None) -> bool:
+    """
+    Update schedule (and related event) status by job_id.
+
+    When `next_run_date` is given the schedule is advanced in the same
+    statement, so a reminder fire is persisted with a single UPDATE.
+    """
+    event_statuses = {"complete": "completed", "cancelled": "cancelled"}
 
-def update_schedule_run_date(session: Session, job_id: str, next_run_date: datetime) -> bool:
-    """update schedule next run time"""
     try:
-        schedule = session.query(Schedule).filter(Schedule.job_id == job_id).first()
-        if schedule:
-            schedule.scheduled_time = next_run_date
-            session.commit()
-            logging.info(f"Update scheduled next run time for job: {job_id} to {next_run_date}")
+        params = {'job_id': job_id, 'schedule_status': status, 'next_run_date': next_run_date}
+
+        event_status = event_statuses.get(status)
+        if event_status:
+            params['event_status'] = event_status
+            updated = session.execute(_UPDATE_SCHEDULE_AND_EVENT, params).first()
+        else:
+            updated = session.execute(_UPDATE_SCHEDULE, params).first()
+        session.commit()
+
+        if updated:
+            logging.info(f"Updated status for job {job_id} to {status}")
             return True
 
         logging.warning(f"No schedule found for job_id {job_id}")
         return False
+
     except Exception as e:
-        logging.error(f"Error updating next run time for job {job_id}: {e}")
+        logging.error(f"Error updating status for job {job_id}: {e}")
         session.rollback()
         return False
 
@@ -194,64 +286,70 @@ def update_user_timezone(session: Session, chat_id: int, timezone: str):
     return None
 
 
-def get_or_create_tags(session: Session, tag_names: List[str]) -> List[Tag]:
-    """Get existing tags or create new ones"""
-    tags = []
-    try:
-        for tag_name in tag_names:
-            if not tag_name.strip():
-                continue
-
-            tag = session.query(Tag).filter(Tag.name == tag_name.strip()).first()
-            if not tag:
-                tag = Tag(name=tag_name.strip())
-                session.add(tag)
-            tags.append(tag)
-
-        session.commit()
-        return tags
+def create_reminder(session: Session, user_id: uuid.UUID, event_name: str,
+                    description: str, scheduled_time: datetime, job_id: str,
+                    event_type: str = "one-time", rrule: Optional[str] = None,
+                    tag_names: Optional[List[str]] = None,
+                    google_event_id: Optional[str] = None) -> Optional[uuid.UUID]:
+    """
+    Create the schedule, event and tag links for a reminder as one unit of work.
 
-    except Exception as e:
-        logging.error(f"Error getting/creating tags: {e}")
-        session.rollback()
-        return []
+    Primary keys are generated up front so the whole insert chain is sent as a
+    single statement of data-modifying CTEs and committed once.
+    """
+    try:
+        schedule_id = uuid.uuid4()
+        event_id = uuid.uuid4()
 
+        schedules = Schedule.__table__
+        events = Event.__table__
 
-def create_full_event(session: Session, user_id: uuid.UUID, event_name: str,
-                      description: str, scheduled_time: datetime, job_id: str,
-                      event_type: str = "one-time", rrule: Optional[str] = None,
-                      tags: Optional[List[Tag]] = None) -> Optional[Event]:
-    """Create a complete event with schedule"""
-    try:
-        # Create the schedule first
-        schedule = Schedule(
+        new_schedule = insert(schedules).values(
+            id=schedule_id,
             job_id=job_id,
             type=event_type,
             scheduled_time=scheduled_time,
             rrule=rrule,
             status="pending"
-        )
-        session.add(schedule)
-        session.flush()  # Get the schedule ID
-
-        # Create the event
-        event = Event(
-            user_id=user_id,
-            schedule_id=schedule.id,
-            event_name=event_name,
-            description=description,
-            status="active"
+        ).returning(schedules.c.id).cte("new_schedule")
+
+        new_event = insert(events).from_select(
+            [events.c.id, events.c.user_id, events.c.schedule_id, events.c.event_name,
+             events.c.description, events.c.status, events.c.google_event_id],
+            select(
+                literal(event_id, UUID(as_uuid=True)),
+                literal(user_id, UUID(as_uuid=True)),
+                new_schedule.c.id,
+                literal(event_name, String),
+                literal(description, Text),
+                literal("active", String),
+                literal(google_event_id, String)
+            )
         )
 
-        # Add tags if provided
-        if tags:
-            event.tags = tags
+        names = list(dict.fromkeys(name.strip() for name in (tag_names or []) if name and name.strip()))
+        if names:
+            tags = Tag.__table__
+            upsert_tags = pg_insert(tags).values([{'id': uuid.uuid4(), 'name': name} for name in names])
+            # DO UPDATE (instead of DO NOTHING) so existing tags are returned as well
+            upsert_tags = upsert_tags.on_conflict_do_update(
+                index_elements=[tags.c.name],
+                set_={'name': upsert_tags.excluded.name}
+            ).returning(tags.c.id).cte("upserted_tags")
+
+            new_event = new_event.returning(events.c.id).cte("new_event")
+            stmt = insert(event_tags_association).from_select(
+                ['event_id', 'tag_id'],
+                select(new_event.c.id, upsert_tags.c.id)
+            )
+        else:
+            stmt = new_event
 
-        session.add(event)
+        session.execute(stmt)
         session.commit()
 
         logging.info(f"Created event {event_name} with job_id {job_id}")
-        return event.id
+        return event_id
 
     except Exception as e:
         logging.error(f"Error creating event {event_name}: {e}")
@@ -259,6 +357,88 @@ def create_full_event(session: Session, user_id: uuid.UUID, event_name: str,
         return None
 
 
+def archive_finished_events(session: Session, older_than: datetime, batch_size: int) -> int:
+    """
+    Move one batch of completed/cancelled events, their schedules and tag links
+    into the archive tables. Returns the number of events archived.
+    """
+    try:
+        batch = session.execute(
+            select(Event.id, Event.schedule_id).where(
+                Event.status.in_(['completed', 'cancelled']),
+                Event.updated_at < older_than
+            ).order_by(Event.updated_at).limit(batch_size).with_for_update(skip_locked=True)
+        ).all()
+
+        if not batch:
+            return 0
+
+        event_ids = [row.id for row in batch]
+        schedule_ids = [row.schedule_id for row in batch]
+
+        schedules = Schedule.__table__
+        events = Event.__table__
+        schedule_columns = [c.name for c in schedules.columns]
+        event_columns = [c.name for c in events.columns]
+
+        session.execute(insert(ScheduleArchive.__table__).from_select(
+            schedule_columns, select(*schedules.columns).where(schedules.c.id.in_(schedule_ids))
+        ))
+        session.execute(insert(EventArchive.__table__).from_select(
+            event_columns, select(*events.columns).where(events.c.id.in_(event_ids))
+        ))
+        session.execute(insert(event_tags_archive).from_select(
+            ['event_id', 'tag_id'],
+            select(event_tags_association.c.event_id, event_tags_association.c.tag_id).where(
+                event_tags_association.c.event_id.in_(event_ids)
+            )
+        ))
+
+        # event_tags rows go with the events through ON DELETE CASCADE
+        session.execute(delete(events).where(events.c.id.in_(event_ids)))
+        session.execute(delete(schedules).where(schedules.c.id.in_(schedule_ids)))
+        session.commit()
+
+        logging.info(f"Archived {len(event_ids)} finished events")
+        return len(event_ids)
+
+    except Exception as e:
+        logging.error(f"Error archiving finished events: {e}")
+        session.rollback()
+        return 0
+
+
+def claim_update(session: Session, update_id: int) -> bool:
+    """Record an update id; returns False if it was already processed"""
+    try:
+        stmt = pg_insert(ProcessedUpdate.__table__).values(update_id=update_id).on_conflict_do_nothing(
+            index_elements=['update_id']
+        ).returning(ProcessedUpdate.__table__.c.update_id)
+        claimed = session.execute(stmt).first() is not None
+        session.commit()
+        return claimed
+
+    except Exception as e:
+        logging.error(f"Error recording processed update {update_id}: {e}")
+        session.rollback()
+        # Don't drop updates because the dedup table is unavailable
+        return True
+
+
+def delete_processed_updates_before(session: Session, older_than: datetime) -> int:
+    try:
+        result = session.execute(
+            delete(ProcessedUpdate.__table__).where(ProcessedUpdate.__table__.c.created_at < older_than)
+        )
+        session.commit()
+        return result.rowcount
+
+    except Exception as e:
+        logging.error(f"Error cleaning up processed updates: {e}")
+        session.rollback()
+        return 0
+
+
 def delete_event(session: Session, event_id: uuid.UUID) -> bool:
     """Delete an event and its schedule"""
     try:
@@ -290,7 +470,7 @@ def store_google_tokens(session: Session, chat_id: int, access_token: str, refre
 
         logging.debug(f"Attempting to store Google tokens for user {chat_id}")
 
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         if user:
@@ -302,7 +482,10 @@ def store_google_tokens(session: Session, chat_id: int, access_token: str, refre
             user.google_refresh_token = encrypted_refresh_token
             user.google_token_expires_at = expires_at
             user.google_calendar_id = calendar_id or 'primary'
+            user.google_token_refresh_failures = 0
+            user.google_token_retry_after = None
             session.commit()
+            GOOGLE_CREDENTIALS.invalidate(chat_id)
             logging.info(f"Google tokens stored successfully for user {chat_id}")
             return True
         else:
@@ -322,20 +505,29 @@ def store_google_tokens(session: Session, chat_id: int, access_token: str, refre
 
 
 def get_google_tokens(session: Session, chat_id: int):
-    """Retrieve and decrypt Google Calendar tokens for a user"""
+    """
+    Retrieve and decrypt Google Calendar tokens for a user; None means Calendar is not connected.
+    Served from GOOGLE_CREDENTIALS for a short while so bursts skip the SELECT and decryption.
+    """
     from utils.encryption import decrypt_token
 
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        tokens = GOOGLE_CREDENTIALS.get(chat_id)
+        if tokens:
+            return tokens
+
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         if user and user.google_access_token:
-            return {
+            tokens = {
                 'access_token': decrypt_token(user.google_access_token),
                 'refresh_token': decrypt_token(user.google_refresh_token) if user.google_refresh_token else None,
                 'expires_at': user.google_token_expires_at,
                 'calendar_id': user.google_calendar_id
             }
+            GOOGLE_CREDENTIALS.set(chat_id, tokens)
+            return tokens
         return None
 
     except Exception as e:
@@ -343,18 +535,72 @@ def get_google_tokens(session: Session, chat_id: int):
         return None
 
 
+def get_users_with_expiring_google_tokens(session: Session, expires_before: datetime, limit: int):
+    """
+    Return (chat_id, refresh_token) for connected users whose access token expires before the given time.
+    Users backing off after failed refreshes are left out, so they cannot crowd out healthy ones.
+    """
+    from utils.encryption import decrypt_token
+
+    try:
+        stmt = select(Users.chat_id, Users.google_refresh_token).where(
+            Users.google_refresh_token.isnot(None),
+            Users.google_token_expires_at < expires_before,
+            (Users.google_token_retry_after.is_(None)) | (Users.google_token_retry_after <= datetime.utcnow())
+        ).order_by(Users.google_token_expires_at).limit(limit)
+        rows = session.execute(stmt).all()
+
+    except Exception as e:
+        logging.error(f"Error getting users with expiring Google tokens: {e}")
+        session.rollback()
+        return []
+
+    users = []
+    for chat_id, refresh_token in rows:
+        try:
+            users.append((chat_id, decrypt_token(refresh_token)))
+        except Exception as e:
+            logging.error(f"Could not decrypt Google refresh token for user {chat_id}: {e}")
+    return users
+
+
+def record_google_token_refresh_failure(session: Session, chat_id: int, base_minutes: int, max_minutes: int) -> bool:
+    """Count a failed background refresh and back off exponentially (capped) before the next attempt"""
+    try:
+        backoff_minutes = func.least(base_minutes * func.power(2, Users.google_token_refresh_failures), max_minutes)
+        session.execute(
+            update(Users).where(Users.chat_id == chat_id).values(
+                google_token_refresh_failures=Users.google_token_refresh_failures + 1,
+                # make_interval(years, months, weeks, days, hours, mins, secs); secs takes the fractional value
+                google_token_retry_after=literal(datetime.utcnow(), DateTime) + func.make_interval(
+                    0, 0, 0, 0, 0, 0, backoff_minutes * 60
+                )
+            )
+        )
+        session.commit()
+        return True
+
+    except Exception as e:
+        logging.error(f"Error recording Google token refresh failure for user {chat_id}: {e}")
+        session.rollback()
+        return False
+
+
 def update_google_access_token(session: Session, chat_id: int, new_access_token: str, expires_at: datetime):
     """Update the access token when refreshed"""
     from utils.encryption import encrypt_token
 
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         if user:
             user.google_access_token = encrypt_token(new_access_token)
             user.google_token_expires_at = expires_at
+            user.google_token_refresh_failures = 0
+            user.google_token_retry_after = None
             session.commit()
+            GOOGLE_CREDENTIALS.invalidate(chat_id)
             return True
         return False
 
@@ -367,7 +613,7 @@ def update_google_access_token(session: Session, chat_id: int, new_access_token:
 def remove_google_tokens(session: Session, chat_id: int):
     """Remove Google Calendar tokens (when user disconnects)"""
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         if user:
@@ -376,6 +622,7 @@ def remove_google_tokens(session: Session, chat_id: int):
             user.google_token_expires_at = None
             user.google_calendar_id = None
             session.commit()
+            GOOGLE_CREDENTIALS.invalidate(chat_id)
             logging.info(f"Google tokens removed for user {chat_id}")
             return True
         return False
@@ -389,7 +636,10 @@ def remove_google_tokens(session: Session, chat_id: int):
 def is_google_calendar_connected(session: Session, chat_id: int) -> bool:
     """Check if user has Google Calendar connected"""
     try:
-        stmt = select(Users).where(Users.chat_id == chat_id)
+        if chat_id in GOOGLE_CREDENTIALS:
+            return True
+
+        stmt = user_by_chat_id_stmt(chat_id)
         user = session.scalars(stmt).first()
 
         return user and user.google_access_token is not None
@@ -399,20 +649,171 @@ def is_google_calendar_connected(session: Session, chat_id: int) -> bool:
         return False
 
 
+def get_calendar_backfill_page(session: Session, chat_id: int, limit: int,
+                               cursor: Optional[Tuple[datetime, uuid.UUID]] = None) -> list:
+    """
+    Keyset page of a user's active reminders that have no calendar event yet,
+    ordered by (scheduled_time, id). Pass the last row's (scheduled_time, event_id) as `cursor`.
+    """
+    try:
+        stmt = select(
+            Event.id.label('event_id'),
+            Event.event_name,
+            Event.description,
+            Schedule.scheduled_time,
+            Schedule.rrule,
+            Users.timezone
+        ).join(
+            Schedule, Event.schedule_id == Schedule.id
+        ).join(
+            Users, Event.user_id == Users.id
+        ).where(
+            Users.chat_id == chat_id,
+            Event.status == 'active',
+            Event.google_event_id.is_(None)
+        )
+
+        if cursor:
+            stmt = stmt.where(tuple_(Schedule.scheduled_time, Event.id) > tuple_(*cursor))
+
+        stmt = stmt.order_by(Schedule.scheduled_time.asc(), Event.id.asc()).limit(limit)
+        return session.execute(stmt).all()
+
+    except Exception as e:
+        logging.error(f"Error getting calendar backfill page for user {chat_id}: {e}")
+        session.rollback()
+        return []
+
+
+def get_users_for_calendar_sync(session: Session, limit: int) -> list:
+    """Connected users, least recently synced first: (user_id, chat_id, timezone, google_sync_token)"""
+    try:
+        stmt = select(Users.id, Users.chat_id, Users.timezone, Users.google_sync_token).where(
+            Users.google_refresh_token.isnot(None)
+        ).order_by(Users.google_synced_at.asc().nulls_first()).limit(limit)
+        return session.execute(stmt).all()
+
+    except Exception as e:
+        logging.error(f"Error getting users for calendar sync: {e}")
+        session.rollback()
+        return []
+
+
+def update_google_sync_token(session: Session, chat_id: int, sync_token: Optional[str]) -> bool:
+    """Store the calendar sync token (None forces a full resync) and stamp the sync time"""
+    try:
+        session.execute(
+            update(Users).where(Users.chat_id == chat_id).values(
+                google_sync_token=sync_token, google_synced_at=func.now()
+            )
+        )
+        session.commit()
+        return True
+
+    except Exception as e:
+        logging.error(f"Error updating calendar sync token for user {chat_id}: {e}")
+        session.rollback()
+        return False
+
+
+def get_events_by_google_ids(session: Session, user_id: uuid.UUID, google_event_ids: List[str]) -> dict:
+    """A user's reminders linked to the given calendar events, keyed by google_event_id"""
+    try:
+        stmt = select(
+            Event.id.label('event_id'),
+            Event.google_event_id,
+            Event.status,
+            Event.event_name,
+            Event.description,
+            Event.updated_at,
+            Schedule.job_id,
+            Schedule.scheduled_time,
+            Schedule.rrule
+        ).join(
+            Schedule, Event.schedule_id == Schedule.id
+        ).where(
+            Event.user_id == user_id,
+            Event.google_event_id.in_(google_event_ids)
+        )
+        return {row.google_event_id: row for row in session.execute(stmt)}
+
+    except Exception as e:
+        logging.error(f"Error getting events by google event ids for user {user_id}: {e}")
+        session.rollback()
+        return {}
+
+
+def get_archived_google_event_ids(session: Session, user_id: uuid.UUID, google_event_ids: List[str]) -> set:
+    """Which of the given calendar events belong to the user's archived (finished or cancelled) reminders"""
+    try:
+        stmt = select(EventArchive.google_event_id).where(
+            EventArchive.user_id == user_id,
+            EventArchive.google_event_id.in_(google_event_ids)
+        )
+        return set(session.scalars(stmt))
+
+    except Exception as e:
+        logging.error(f"Error getting archived google event ids for user {user_id}: {e}")
+        session.rollback()
+        return set()
+
+
+def update_synced_event(session: Session, event_id: uuid.UUID, job_id: str, event_name: str, description: str,
+                        scheduled_time: datetime, rrule: Optional[str]) -> bool:
+    """Apply an edit made in Google Calendar to the event and its schedule"""
+    try:
+        session.execute(
+            update(Event).where(Event.id == event_id).values(event_name=event_name, description=description)
+        )
+        session.execute(
+            update(Schedule).where(Schedule.job_id == job_id).values(
+                scheduled_time=scheduled_time,
+                rrule=rrule,
+                type='recurring' if rrule else 'one_time'
+            )
+        )
+        session.commit()
+        return True
+
+    except Exception as e:
+        logging.error(f"Error updating synced event {event_id}: {e}")
+        session.rollback()
+        return False
+
+
+def set_google_event_ids(session: Session, google_event_ids: dict) -> bool:
+    """Set Event.google_event_id for many events ({event_id: google_event_id or None}) in one executemany"""
+    try:
+        events = Event.__table__
+        stmt = update(events).where(events.c.id == bindparam('event_pk')).values(
+            google_event_id=bindparam('new_google_event_id')
+        )
+        session.execute(stmt, [
+            {'event_pk': event_id, 'new_google_event_id': google_event_id}
+            for event_id, google_event_id in google_event_ids.items()
+        ])
+        session.commit()
+        return True
+
+    except Exception as e:
+        logging.error(f"Error setting google event ids for {len(google_event_ids)} events: {e}")
+        session.rollback()
+        return False
+
+
 def add_google_event_id_to_events(session: Session, event_id: uuid.UUID, google_event_id: str):
     try:
-        # Select the full Event object, not just the id
-        stmt = select(Event).where(Event.id == event_id)
-        event = session.scalars(stmt).first()
+        result = session.execute(
+            update(Event).where(Event.id == event_id).values(google_event_id=google_event_id)
+        )
+        session.commit()
 
-        if event:
-            event.google_event_id = google_event_id
-            session.commit()
+        if result.rowcount:
             logging.info(f"Added google event id {google_event_id} to event: {event_id}")
             return True
-        else:
-            logging.warning(f"Event with id {event_id} not found")
-            return False
+
+        logging.warning(f"Event with id {event_id} not found")
+        return False
 
     except Exception as e:
         logging.error(f"Error adding google event id to event {event_id}: {e}")
@@ -1,9 +1,12 @@
 from dataclasses import dataclass
+from typing import Optional
 from aiogram import Bot
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from sqlalchemy.orm import sessionmaker
 
 from services.ai_services import AIManager
+from services.calendar_sync import CalendarSyncWorker
+from services.g_calendar import GoogleCalendarClient
 from utils.language_manager import LanguageManager
 
 
@@ -15,5 +18,9 @@ class BotDependencies:
     scheduler: AsyncIOScheduler
     ai_manager: AIManager
     lm: LanguageManager
+    # Read-only handler paths (replica or separate pool); falls back to session_factory
+    read_session_factory: Optional[sessionmaker] = None
+    calendar_client: Optional[GoogleCalendarClient] = None
+    calendar_sync: Optional[CalendarSyncWorker] = None
 
 
@@ -2,7 +2,7 @@ import uuid
 import logging
 
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Table, Index, UUID, \
-    BigInteger
+    BigInteger, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 from sqlalchemy.sql import func
 
@@ -36,6 +36,10 @@ class Users(Base):
     google_refresh_token = Column(Text, nullable=True)  # Encrypted refresh token
     google_calendar_id = Column(String, nullable=True)  # Primary calendar ID
     google_token_expires_at = Column(DateTime, nullable=True)  # Token expiration time
+    google_sync_token = Column(Text, nullable=True)  # nextSyncToken of the last incremental calendar sync
+    google_synced_at = Column(DateTime, nullable=True)  # When the calendar was last synced
+    google_token_refresh_failures = Column(Integer, nullable=False, default=0, server_default='0')
+    google_token_retry_after = Column(DateTime, nullable=True)  # Background refresh backs off until then
     events = relationship("Event", back_populates="user", cascade="all, delete-orphan")
 
     def __repr__(self):
@@ -71,6 +75,17 @@ class Event(Base):
     )
     tags = relationship("Tag", secondary=event_tags_association, back_populates="events")
 
+    __table_args__ = (
+        # Active reminders of a user (list/cancel screens)
+        Index('ix_events_user_id_active', 'user_id', postgresql_where=text("status = 'active'")),
+        # Finished events waiting for the retention job
+        Index('ix_events_finished_updated_at', 'updated_at',
+              postgresql_where=text("status IN ('completed', 'cancelled')")),
+        # Mapping calendar changes back to reminders
+        Index('ix_events_user_id_google_event_id', 'user_id', 'google_event_id',
+              postgresql_where=text("google_event_id IS NOT NULL")),
+    )
+
     def __repr__(self):
         return f"<Event(id={self.id}, name='{self.event_name}', status='{self.status}')>"
 
@@ -112,11 +127,68 @@ class Tag(Base):
         return f"<Tag(id={self.id}, name='{self.name}')>"
 
 
+class ScheduleArchive(Base):
+    """
+    Completed and cancelled schedules moved out of the schedules table by the retention job.
+    """
+    __tablename__ = "schedules_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    job_id = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    scheduled_time = Column(DateTime, nullable=False)
+    rrule = Column(String)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class EventArchive(Base):
+    """
+    Completed and cancelled events moved out of the events table by the retention job.
+    """
+    __tablename__ = "events_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    schedule_id = Column(UUID(as_uuid=True), nullable=False)
+    event_name = Column(String, nullable=False)
+    description = Column(Text)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    google_event_id = Column(String)
+    archived_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<EventArchive(id={self.id}, name='{self.event_name}', status='{self.status}')>"
+
+
+event_tags_archive = Table(
+    'event_tags_archive',
+    Base.metadata,
+    Column('event_id', UUID(as_uuid=True), primary_key=True),
+    Column('tag_id', UUID(as_uuid=True), primary_key=True),
+)
+
+
+class ProcessedUpdate(Base):
+    """
+    Telegram update ids that have already been handled, for duplicate suppression across restarts.
+    """
+    __tablename__ = "processed_updates"
+
+    update_id = Column(BigInteger, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now(), index=True)
+
+
 def create_database(settings: Settings):
     """
-    Initializes the database engine and creates all tables if they don't exist
-    :return:
+    Startup schema check: applies pending migrations, if any.
+    `create_all` only runs as part of the initial migration, not on every start.
     """
+    from migrations import get_pending_migrations, run_migrations
+
     db_user = settings.db_user
     db_password = settings.db_password
     db_host = settings.db_host
@@ -125,11 +197,14 @@ def create_database(settings: Settings):
 
     db_url = f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
 
-    # Create the SQLAlchemy engine
-    engine = create_engine(db_url, echo=True)
-
-    logging.info(f"Connecting to PostgreSQL database: {db_url}")
-    Base.metadata.create_all(engine)
-
-    logging.info("Database setup complete. All tables are ready in PostgreSQL.")
-
+    engine = create_engine(db_url, pool_size=1, max_overflow=1)
+    try:
+        logging.info(f"Checking database schema on {db_host}:{db_port}/{db_name}")
+        if not get_pending_migrations(engine):
+            logging.info("Database schema is up to date.")
+            return
+
+        applied = run_migrations(engine)
+        logging.info(f"Database setup complete. Applied {applied} migration(s).")
+    finally:
+        engine.dispose()
@@ -0,0 +1,26 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+
+
+def archive_finished_reminders(session_factory: sessionmaker, retention_days: int, batch_size: int) -> int:
+    """
+    Scheduler job: moves completed and cancelled reminders older than the retention
+    period into the archive tables, one batch per transaction, until none are left.
+    """
+    older_than = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+
+    with session_factory() as session:
+        while True:
+            archived = db.archive_finished_events(session, older_than, batch_size)
+            total += archived
+            if archived < batch_size:
+                break
+
+    if total:
+        logging.info(f"Retention: archived {total} reminders finished before {older_than}")
+    return total
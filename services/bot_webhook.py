@@ -0,0 +1,69 @@
+import asyncio
+import logging
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config.settings import Settings
+
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """
+    Webhook handler that processes each update inside its request, with at most
+    `max_in_flight` updates being handled at the same time. Requests over the
+    limit wait for a free slot, which Telegram sees as back-pressure.
+    """
+
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_in_flight: int, secret_token: str = None, **data):
+        super().__init__(dispatcher, bot, handle_in_background=False, secret_token=secret_token, **data)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.max_in_flight = max_in_flight
+
+    @property
+    def in_flight(self) -> int:
+        return self.max_in_flight - self._semaphore._value
+
+    async def handle(self, request: web.Request) -> web.Response:
+        # Reject bad secrets before they take a processing slot
+        if not self.verify_secret(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.bot):
+            return web.Response(body="Unauthorized", status=401)
+
+        async with self._semaphore:
+            return await super().handle(request)
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, settings: Settings):
+    """Serves Telegram updates over a webhook until cancelled."""
+    if not settings.webhook_base_url:
+        raise ValueError("WEBHOOK_BASE_URL is required when BOT_MODE=webhook")
+    if not settings.webhook_secret:
+        raise ValueError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
+
+    app = web.Application()
+    BoundedRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        max_in_flight=settings.webhook_max_in_flight,
+        secret_token=settings.webhook_secret
+    ).register(app, path=settings.webhook_path)
+    setup_application(app, dp, bot=bot)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=settings.webhook_listen_host, port=settings.webhook_listen_port)
+
+    try:
+        await site.start()
+        await bot.set_webhook(
+            url=f"{settings.webhook_base_url.rstrip('/')}{settings.webhook_path}",
+            secret_token=settings.webhook_secret,
+            max_connections=settings.webhook_max_in_flight,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+        logging.info(f"Webhook server listening on {settings.webhook_listen_host}:{settings.webhook_listen_port}"
+                     f"{settings.webhook_path}")
+
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from datetime import timedelta
+from typing import Optional
+
+import pytz
+from aiogram import Bot
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+from services.calendar_sync import push_calendar_operations, run_in_session
+from services.g_calendar import GoogleCalendarClient, CalendarOperation, build_event_body, MAX_BATCH_SIZE
+from utils.language_manager import LanguageManager
+
+
+def build_backfill_operation(row) -> CalendarOperation:
+    """Calendar insert for one backfill row, with the same 15 minute slot as new reminders"""
+    user_tz = pytz.timezone(row.timezone or 'UTC')
+    start_time = pytz.utc.localize(row.scheduled_time).astimezone(user_tz)
+    body = build_event_body(row.event_name, row.description, start_time, start_time + timedelta(minutes=15),
+                            str(user_tz), row.rrule)
+    return CalendarOperation(action='insert', event_id=row.event_id, body=body)
+
+
+async def backfill_calendar_events(session_factory: sessionmaker, calendar_client: GoogleCalendarClient, bot: Bot,
+                                   lm: LanguageManager, chat_id: int, language: str, page_size: int = 50,
+                                   batch_interval: float = 1.0, executor: Optional[Executor] = None) -> int:
+    """
+    Background task started after a user connects Google Calendar: streams the
+    user's active reminders without a calendar event in keyset pages, creates
+    them in batch requests (at most one batch per `batch_interval` seconds) and
+    keeps a progress message up to date. Database calls run on `executor`.
+    Returns the number of events created.
+    """
+    page_size = min(page_size, MAX_BATCH_SIZE)
+    tokens = await run_in_session(executor, session_factory, db.get_google_tokens, chat_id)
+    if not tokens:
+        return 0
+
+    progress_message = None
+    synced = 0
+    failed = 0
+    cursor = None
+    try:
+        while True:
+            rows = await run_in_session(executor, session_factory, db.get_calendar_backfill_page,
+                                        chat_id, page_size, cursor)
+            if not rows:
+                break
+            cursor = (rows[-1].scheduled_time, rows[-1].event_id)
+
+            if progress_message is None:
+                progress_message = await bot.send_message(
+                    chat_id=chat_id, text=lm.get_string("google_calendar.backfill_started", language)
+                )
+
+            result = await push_calendar_operations(
+                session_factory, calendar_client, tokens['access_token'],
+                [build_backfill_operation(row) for row in rows],
+                calendar_id=tokens.get('calendar_id') or 'primary',
+                executor=executor
+            )
+            synced += result['succeeded']
+            failed += len(result['failed'])
+
+            if len(rows) < page_size:
+                break
+
+            await progress_message.edit_text(
+                text=lm.get_string("google_calendar.backfill_progress", language, synced=synced)
+            )
+            await asyncio.sleep(batch_interval)
+
+        if progress_message is not None:
+            key = "google_calendar.backfill_partial" if failed else "google_calendar.backfill_done"
+            await progress_message.edit_text(text=lm.get_string(key, language, synced=synced, failed=failed))
+
+    except Exception as e:
+        logging.error(f"Calendar backfill failed for user {chat_id} after {synced} events: {e}")
+
+    logging.info(f"Calendar backfill for user {chat_id}: {synced} created, {failed} failed")
+    return synced
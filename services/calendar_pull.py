@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytz
+from dateutil.parser import isoparse
+from dateutil.rrule import rrulestr
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+from services.g_calendar import GoogleCalendarClient, CalendarApiError, EVENT_SOURCE_KEY, EVENT_SOURCE_VALUE
+
+
+def parse_calendar_item(item: dict) -> Optional[dict]:
+    """
+    Reminder fields of a Calendar event resource, or None for events that
+    cannot be a reminder (all-day events, single instances of a recurring series).
+    """
+    start = item.get('start', {})
+    if 'dateTime' not in start or item.get('recurringEventId'):
+        return None
+
+    start_time = isoparse(start['dateTime'])
+    if start_time.tzinfo is None:
+        start_time = pytz.timezone(start.get('timeZone', 'UTC')).localize(start_time)
+
+    rrule = next((line[len("RRULE:"):] for line in item.get('recurrence', []) if line.startswith("RRULE:")), None)
+    return {
+        'event_name': item.get('summary') or "Untitled Event",
+        'description': item.get('description') or "",
+        'scheduled_time': start_time.astimezone(pytz.utc).replace(tzinfo=None),
+        'rrule': rrule,
+    }
+
+
+def _series_start(fields: dict, user_tz: pytz.BaseTzInfo) -> datetime:
+    return pytz.utc.localize(fields['scheduled_time']).astimezone(user_tz)
+
+
+def next_occurrence(fields: dict, user_tz: pytz.BaseTzInfo, after: datetime) -> Optional[datetime]:
+    """Next occurrence (naive UTC) of a recurring calendar event at or after `after` (naive UTC)"""
+    rule = rrulestr(fields['rrule'], dtstart=_series_start(fields, user_tz))
+    occurrence = rule.after(pytz.utc.localize(after), inc=True)
+    return occurrence.astimezone(pytz.utc).replace(tzinfo=None) if occurrence else None
+
+
+def calendar_fields_changed(local, fields: dict, user_tz: pytz.BaseTzInfo) -> bool:
+    """
+    Whether the calendar-owned fields differ from the reminder. A recurring
+    reminder's scheduled_time moves to its next occurrence on every fire, so it
+    only counts as changed when it is no longer an occurrence of the calendar series.
+    """
+    if (local.event_name != fields['event_name'] or (local.description or "") != fields['description']
+            or local.rrule != fields['rrule']):
+        return True
+    if not fields['rrule']:
+        return local.scheduled_time != fields['scheduled_time']
+    try:
+        scheduled_time = pytz.utc.localize(local.scheduled_time)
+        rule = rrulestr(fields['rrule'], dtstart=_series_start(fields, user_tz))
+        return not rule.between(scheduled_time - timedelta(seconds=1), scheduled_time + timedelta(seconds=1), inc=True)
+    except (ValueError, TypeError):
+        return True
+
+
+def edited_after(item: dict, local) -> bool:
+    """Whether Google's last modification of the event is newer than the reminder's"""
+    if not item.get('updated'):
+        return False
+    updated = isoparse(item['updated']).astimezone(pytz.utc).replace(tzinfo=None)
+    return updated > local.updated_at
+
+
+class CalendarPullSync:
+    """
+    Pulls changes users make directly in Google Calendar into reminders using
+    events.list with a per-user syncToken, so each run only transfers what
+    changed since the previous one. A 410 (expired token) falls back to a full sync.
+    """
+
+    def __init__(self, session_factory: sessionmaker, calendar_client: GoogleCalendarClient,
+                 scheduler: AsyncIOScheduler, bot_token: str):
+        self.session_factory = session_factory
+        self.calendar_client = calendar_client
+        self.scheduler = scheduler
+        self.bot_token = bot_token
+
+    async def sync_all(self, concurrency: int, max_users: int) -> int:
+        """Scheduler job: syncs up to `max_users` users, `concurrency` at a time. Returns changes applied."""
+        with self.session_factory() as session:
+            users = db.get_users_for_calendar_sync(session, max_users)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def sync_one(user):
+            async with semaphore:
+                try:
+                    return await self.sync_user(user.user_id, user.chat_id, user.timezone, user.google_sync_token)
+                except Exception as e:
+                    logging.error(f"Calendar pull sync failed for user {user.chat_id}: {e}")
+                    # Stamp the attempt so a failing user moves to the back of the queue instead of taking a slot every run
+                    with self.session_factory() as session:
+                        db.update_google_sync_token(session, user.chat_id, user.google_sync_token)
+                    return 0
+
+        applied = sum(await asyncio.gather(*[sync_one(user) for user in users]))
+        if users:
+            logging.info(f"Calendar pull sync: {applied} changes applied for {len(users)} users")
+        return applied
+
+    async def sync_user(self, user_id: uuid.UUID, chat_id: int, timezone: str, sync_token: Optional[str]) -> int:
+        with self.session_factory() as session:
+            tokens = db.get_google_tokens(session, chat_id)
+        if not tokens:
+            return 0
+        access_token = tokens['access_token']
+        calendar_id = tokens.get('calendar_id') or 'primary'
+
+        full_sync = sync_token is None
+        try:
+            items, next_sync_token = await self._list_changes(access_token, calendar_id, sync_token)
+        except CalendarApiError as e:
+            if e.status != 410 or full_sync:
+                raise
+            logging.info(f"Calendar sync token expired for user {chat_id}, running a full sync")
+            full_sync = True
+            items, next_sync_token = await self._list_changes(access_token, calendar_id, None)
+
+        applied = self._apply_changes(user_id, chat_id, pytz.timezone(timezone or 'UTC'), items, full_sync)
+
+        with self.session_factory() as session:
+            db.update_google_sync_token(session, chat_id, next_sync_token)
+        return applied
+
+    async def _list_changes(self, access_token: str, calendar_id: str, sync_token: Optional[str]):
+        items = []
+        page_token = None
+        while True:
+            page = await self.calendar_client.list_events(access_token, calendar_id, sync_token, page_token)
+            items.extend(page.get('items', []))
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                return items, page.get('nextSyncToken')
+
+    def _apply_changes(self, user_id: uuid.UUID, chat_id: int, user_tz: pytz.BaseTzInfo, items: list,
+                       full_sync: bool) -> int:
+        if not items:
+            return 0
+
+        applied = 0
+        with self.session_factory() as session:
+            google_event_ids = [item['id'] for item in items]
+            known = db.get_events_by_google_ids(session, user_id, google_event_ids)
+            # Events of reminders that finished or were cancelled and have since been archived
+            archived = db.get_archived_google_event_ids(session, user_id, google_event_ids)
+
+            for item in items:
+                if item.get('id') in archived:
+                    continue
+                # One malformed or unsupported event must not stall the rest of the user's sync
+                try:
+                    if self._apply_item(session, user_id, chat_id, user_tz, item, known.get(item.get('id'))):
+                        applied += 1
+                except Exception as e:
+                    logging.error(f"Skipping calendar event {item.get('id')} for user {chat_id}: {e}")
+
+        if full_sync:
+            logging.info(f"Full calendar sync for user {chat_id}: {applied} of {len(items)} events applied")
+        return applied
+
+    def _apply_item(self, session, user_id: uuid.UUID, chat_id: int, user_tz: pytz.BaseTzInfo, item: dict,
+                    local) -> bool:
+        """Map one changed calendar event onto its reminder. Returns whether anything changed."""
+        from scripts.bot_handlers import build_reminder_job_kwargs, is_supported_rrule, send_reminder
+
+        if item.get('status') == 'cancelled':
+            if local and local.status == 'active':
+                self._remove_job(local.job_id)
+                db.update_event_status(session, job_id=local.job_id, status="cancelled")
+                return True
+            return False
+
+        fields = parse_calendar_item(item)
+        if fields is None or (local and local.status != 'active'):
+            return False
+
+        private_properties = item.get('extendedProperties', {}).get('private', {})
+        created_by_bot = private_properties.get(EVENT_SOURCE_KEY) == EVENT_SOURCE_VALUE
+        if local:
+            # The bot's own events only count once the user edited them in Google after the reminder last changed
+            if created_by_bot and not edited_after(item, local):
+                return False
+            if not calendar_fields_changed(local, fields, user_tz):
+                return False
+        elif created_by_bot:
+            # Created by the bot but its google_event_id is not recorded yet
+            return False
+
+        if fields['rrule'] and not is_supported_rrule(fields['rrule']):
+            logging.info(f"Skipping calendar event {item['id']} for user {chat_id}: "
+                         f"unsupported recurrence {fields['rrule']}")
+            return False
+
+        now = datetime.utcnow()
+        if fields['rrule']:
+            # Reminders store the next fire time, not the start of the series
+            fields['scheduled_time'] = next_occurrence(fields, user_tz, now) or fields['scheduled_time']
+        upcoming = bool(fields['rrule']) or fields['scheduled_time'] > now
+        job_id = local.job_id if local else str(uuid.uuid4())
+        # Built before any row is written, so a rule the builder rejects leaves nothing behind
+        job_kwargs = build_reminder_job_kwargs(
+            self.bot_token, chat_id, fields['event_name'], fields['description'], job_id,
+            fields['scheduled_time'], user_tz, fields['rrule']
+        ) if upcoming else None
+
+        if local:
+            if not db.update_synced_event(session, local.event_id, job_id, **fields):
+                return False
+            if job_kwargs:
+                self.scheduler.add_job(send_reminder, replace_existing=True, **job_kwargs)
+            else:
+                self._remove_job(job_id)
+            return True
+
+        # A full sync lists the whole calendar history; only upcoming events become reminders
+        if not upcoming:
+            return False
+        event_id = db.create_reminder(
+            session, user_id, fields['event_name'], fields['description'], fields['scheduled_time'],
+            job_id, 'recurring' if fields['rrule'] else 'one_time', fields['rrule'],
+            google_event_id=item['id']
+        )
+        if not event_id:
+            return False
+        try:
+            self.scheduler.add_job(send_reminder, replace_existing=True, **job_kwargs)
+        except Exception:
+            db.delete_event(session, event_id)
+            raise
+        return True
+
+    def _remove_job(self, job_id: str):
+        try:
+            self.scheduler.remove_job(job_id)
+        except Exception as e:
+            logging.warning(f"Job {job_id} not found in scheduler, might be already completed or removed: {e}")
@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+from services.g_calendar import GoogleCalendarClient, CalendarOperation, CalendarApiError, GoogleTokenRevokedError, \
+    MAX_BATCH_SIZE, get_oauth_client_config
+
+RETRYABLE_STATUSES = {0, 403, 429, 500, 502, 503, 504}
+
+
+def _call_in_session(session_factory: sessionmaker, crud_function, args: tuple):
+    with session_factory() as session:
+        return crud_function(session, *args)
+
+
+async def run_in_session(executor: Optional[Executor], session_factory: sessionmaker, crud_function, *args):
+    """
+    Run a blocking database_crud function with its own session on `executor`
+    (the loop's default executor if None), so callers on a serving event loop stay responsive.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, _call_in_session, session_factory, crud_function, args
+    )
+
+
+async def _send_batch(calendar_client: GoogleCalendarClient, access_token: str,
+                      operations: List[CalendarOperation], calendar_id: str, can_retry: bool
+                      ) -> Tuple[dict, List[CalendarOperation], List[CalendarOperation], List[CalendarOperation]]:
+    """
+    Send one batch and sort the items by outcome. Returns ({event_id: google_event_id or None},
+    operations to retry, operations that failed for good, operations rejected with 401).
+    """
+    try:
+        results = await calendar_client.batch(access_token, operations, calendar_id)
+    except CalendarApiError as e:
+        logging.error(f"Calendar batch request failed: {e}")
+        results = [(e.status, {})] * len(operations)
+    except Exception as e:
+        logging.error(f"Calendar batch request failed: {e}")
+        results = [(0, {})] * len(operations)
+
+    google_event_ids = {}
+    retry = []
+    failed = []
+    unauthorized = []
+    for operation, (status, body) in zip(operations, results):
+        if 200 <= status < 300 or (operation.action == 'delete' and status in (404, 410)):
+            if operation.action == 'insert':
+                google_event_ids[operation.event_id] = body.get('id')
+            elif operation.action == 'delete':
+                google_event_ids[operation.event_id] = None
+        elif status == 401:
+            # The access token expired; only the caller can refresh it
+            unauthorized.append(operation)
+        elif status in RETRYABLE_STATUSES and can_retry:
+            retry.append(operation)
+        else:
+            logging.warning(f"Calendar {operation.action} for event {operation.event_id} failed "
+                            f"with status {status}")
+            failed.append(operation)
+
+    return google_event_ids, retry, failed, unauthorized
+
+
+async def push_calendar_operations(session_factory: sessionmaker, calendar_client: GoogleCalendarClient,
+                                   access_token: str, operations: List[CalendarOperation],
+                                   calendar_id: str = 'primary', max_attempts: int = 3,
+                                   executor: Optional[Executor] = None) -> dict:
+    """
+    Apply calendar inserts/updates/deletes in batch requests of up to MAX_BATCH_SIZE.
+
+    Items that fail with a retryable status (rate limit, server error, no
+    response) are retried with backoff; the rest are not resent. Resulting
+    Google event ids are written back to Event.google_event_id in one statement,
+    on `executor`.
+    """
+    pending = list(operations)
+    google_event_ids = {}
+    failed = []
+
+    for attempt in range(1, max_attempts + 1):
+        retry = []
+        for offset in range(0, len(pending), MAX_BATCH_SIZE):
+            chunk_ids, chunk_retry, chunk_failed, chunk_unauthorized = await _send_batch(
+                calendar_client, access_token, pending[offset:offset + MAX_BATCH_SIZE], calendar_id,
+                can_retry=attempt < max_attempts
+            )
+            google_event_ids.update(chunk_ids)
+            retry.extend(chunk_retry)
+            failed.extend(chunk_failed + chunk_unauthorized)
+
+        if not retry:
+            break
+        pending = retry
+        await asyncio.sleep(2 ** attempt)
+
+    if google_event_ids:
+        await run_in_session(executor, session_factory, db.set_google_event_ids, google_event_ids)
+
+    succeeded = len(operations) - len(failed)
+    logging.info(f"Calendar batch sync: {succeeded} succeeded, {len(failed)} failed")
+    return {'succeeded': succeeded, 'failed': failed}
+
+
+class CalendarSyncWorker:
+    """
+    Applies calendar cancel/update intents in the background so handlers never
+    wait on Google.
+
+    Intents are coalesced per event while they wait: a later update replaces
+    an earlier one, and a cancel replaces any pending update (an update never
+    replaces a pending cancel). Each user's pending intents go out as one batch
+    at most once per `user_interval` seconds; items that fail with a retryable
+    status are requeued with exponential backoff up to `max_attempts` times.
+    A 401 refreshes the user's access token and resends those items once.
+    """
+
+    def __init__(self, session_factory: sessionmaker, calendar_client: GoogleCalendarClient,
+                 workers: int = 2, user_interval: float = 1.0, max_attempts: int = 5):
+        self.session_factory = session_factory
+        self.calendar_client = calendar_client
+        self.workers = workers
+        self.user_interval = user_interval
+        self.max_attempts = max_attempts
+        self._pending: Dict[int, Dict[uuid.UUID, CalendarOperation]] = {}
+        self._attempts: Dict[uuid.UUID, int] = {}
+        self._last_sent: Dict[int, float] = {}
+        self._last_pruned = 0.0
+        self._queued = set()
+        self._in_flight = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        pending = sum(len(operations) for operations in self._pending.values())
+        if pending:
+            logging.warning(f"Calendar sync stopped with {pending} intents not applied")
+
+    def enqueue_cancel(self, chat_id: int, event_id: uuid.UUID, google_event_id: str):
+        self._enqueue(chat_id, CalendarOperation(action='delete', event_id=event_id, google_event_id=google_event_id))
+
+    def enqueue_update(self, chat_id: int, event_id: uuid.UUID, google_event_id: str, body: dict):
+        self._enqueue(chat_id, CalendarOperation(action='update', event_id=event_id, body=body,
+                                                 google_event_id=google_event_id))
+
+    def _enqueue(self, chat_id: int, operation: CalendarOperation):
+        operations = self._pending.setdefault(chat_id, {})
+        waiting = operations.get(operation.event_id)
+        if waiting and waiting.action == 'delete' and operation.action == 'update':
+            return
+        operations[operation.event_id] = operation
+        self._attempts.pop(operation.event_id, None)
+        self._schedule(chat_id)
+
+    def _schedule(self, chat_id: int, delay: float = 0):
+        if chat_id in self._queued or self._queue is None:
+            return
+        self._queued.add(chat_id)
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, chat_id)
+        else:
+            self._queue.put_nowait(chat_id)
+
+    def _requeue(self, chat_id: int, operations: List[CalendarOperation]):
+        """
+        Put failed items back unless a newer intent for the same event arrived
+        meanwhile; items that reached `max_attempts` are dropped.
+        """
+        waiting = self._pending.setdefault(chat_id, {})
+        delay = 0
+        for operation in operations:
+            if operation.event_id in waiting:
+                continue
+            attempt = self._attempts.get(operation.event_id, 0) + 1
+            if attempt >= self.max_attempts:
+                self._attempts.pop(operation.event_id, None)
+                logging.error(f"Giving up on calendar {operation.action} for event {operation.event_id}")
+                continue
+            self._attempts[operation.event_id] = attempt
+            waiting[operation.event_id] = operation
+            delay = max(delay, 2 ** attempt)
+        if waiting:
+            self._schedule(chat_id, delay)
+        else:
+            self._pending.pop(chat_id, None)
+
+    def _prune_last_sent(self, now: float):
+        """Forget send times that no longer hold anyone back, so the map does not grow with every user ever seen"""
+        if now - self._last_pruned < self.user_interval:
+            return
+        self._last_pruned = now
+        self._last_sent = {chat_id: sent for chat_id, sent in self._last_sent.items()
+                           if sent + self.user_interval > now}
+
+    async def _run(self):
+        while True:
+            chat_id = await self._queue.get()
+            self._queued.discard(chat_id)
+
+            now = time.monotonic()
+            self._prune_last_sent(now)
+
+            # Per-user rate limit and one batch per user at a time: come back later instead of holding this worker
+            wait = self._last_sent.get(chat_id, 0) + self.user_interval - now
+            if wait > 0 or chat_id in self._in_flight:
+                self._schedule(chat_id, max(wait, self.user_interval))
+                continue
+
+            operations = list(self._pending.pop(chat_id, {}).values())
+            if not operations:
+                continue
+            self._last_sent[chat_id] = time.monotonic()
+
+            batch, overflow = operations[:MAX_BATCH_SIZE], operations[MAX_BATCH_SIZE:]
+            if overflow:
+                waiting = self._pending.setdefault(chat_id, {})
+                for operation in overflow:
+                    waiting.setdefault(operation.event_id, operation)
+                self._schedule(chat_id, self.user_interval)
+
+            self._in_flight.add(chat_id)
+            try:
+                await self._apply(chat_id, batch)
+            except Exception as e:
+                logging.error(f"Calendar sync failed for user {chat_id}: {e}")
+                self._requeue(chat_id, batch)
+            finally:
+                self._in_flight.discard(chat_id)
+
+    async def _apply(self, chat_id: int, operations: List[CalendarOperation]):
+        tokens = await run_in_session(None, self.session_factory, db.get_google_tokens, chat_id)
+        if not tokens:
+            logging.info(f"Dropping {len(operations)} calendar intents for disconnected user {chat_id}")
+            return
+        calendar_id = tokens.get('calendar_id') or 'primary'
+
+        google_event_ids, retry, failed, unauthorized = await _send_batch(
+            self.calendar_client, tokens['access_token'], operations, calendar_id, can_retry=True
+        )
+
+        if unauthorized:
+            # Token expired before the background refresher got to it: refresh once and resend those items
+            access_token = await self._refresh_access_token(chat_id, tokens)
+            if access_token:
+                retried_ids, retried_retry, retried_failed, unauthorized = await _send_batch(
+                    self.calendar_client, access_token, unauthorized, calendar_id, can_retry=True
+                )
+                google_event_ids.update(retried_ids)
+                retry.extend(retried_retry)
+                failed.extend(retried_failed)
+            failed.extend(unauthorized)
+
+        for operation in failed:
+            self._attempts.pop(operation.event_id, None)
+            logging.error(f"Giving up on calendar {operation.action} for event {operation.event_id}")
+        for event_id in google_event_ids:
+            self._attempts.pop(event_id, None)
+
+        if google_event_ids:
+            await run_in_session(None, self.session_factory, db.set_google_event_ids, google_event_ids)
+        if retry:
+            self._requeue(chat_id, retry)
+
+    async def _refresh_access_token(self, chat_id: int, tokens: dict) -> Optional[str]:
+        """Refresh and store the user's access token; None if that is not possible"""
+        oauth_config = get_oauth_client_config()
+        if not tokens.get('refresh_token') or not oauth_config:
+            return None
+
+        try:
+            refreshed = await self.calendar_client.refresh_access_token(
+                tokens['refresh_token'], oauth_config['client_id'], oauth_config['client_secret']
+            )
+        except GoogleTokenRevokedError as e:
+            logging.warning(f"Google refresh token of user {chat_id} was revoked, disconnecting: {e}")
+            await run_in_session(None, self.session_factory, db.remove_google_tokens, chat_id)
+            return None
+        if not refreshed:
+            return None
+
+        await run_in_session(None, self.session_factory, db.update_google_access_token, chat_id,
+                             refreshed['access_token'], refreshed['expires_at'])
+        return refreshed['access_token']
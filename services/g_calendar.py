@@ -1,21 +1,33 @@
 import datetime
+import logging
 import os.path
 from datetime import datetime, timedelta
 import json
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from urllib.parse import quote
+
+import aiohttp
 import pytz
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import Flow
 
 from config.settings import Settings
+from utils.metrics import CALENDAR_METRICS, outcome_for_status
 
 settings = Settings()
 
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
+# Configurable so the client can be pointed at a local fake Calendar/OAuth server
+TOKEN_URI = settings.google_token_uri
+CALENDAR_API_BASE = settings.google_calendar_api_base
+BATCH_URL = settings.google_calendar_batch_url
+MAX_BATCH_SIZE = 50
+# Private extended property marking calendar events created by the bot
+EVENT_SOURCE_KEY = "source"
+EVENT_SOURCE_VALUE = "reminder_bot"
 REDIRECT_DOMAIN = settings.web_server_host
 REDIRECT_URI = f"https://{REDIRECT_DOMAIN}/oath2callback"  # Use HTTPS
 
@@ -23,7 +35,7 @@ client_config = {
     "web": {
         "client_id": settings.google_client_id,
         "project_id": "reminder-ai-bot", "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-        "token_uri": "https://oauth2.googleapis.com/token",
+        "token_uri": TOKEN_URI,
         "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
         "client_secret": settings.google_client_secret,
         "redirect_uris": [REDIRECT_URI]
@@ -46,7 +58,7 @@ def get_google_auth_url(chat_id: str, language: str = 'en'):
         prompt="consent",
         state=state_data
     )
-    print(auth_url)
+    logging.debug(f"Google auth url for user {chat_id}: {auth_url}")
 
     return auth_url
 
@@ -61,7 +73,8 @@ def exchange_code_for_tokens(code: str):
         )
 
         # Exchange the authorization code for tokens
-        flow.fetch_token(code=code)
+        with CALENDAR_METRICS.track("oauth.exchange_code"):
+            flow.fetch_token(code=code)
 
         credentials = flow.credentials
 
@@ -79,106 +92,278 @@ def exchange_code_for_tokens(code: str):
         }
 
     except Exception as e:
-        print(f"Error exchanging code for tokens: {e}")
+        logging.error(f"Error exchanging code for tokens: {e}")
         return None
 
 
-def refresh_access_token(refresh_token: str, client_id: str, client_secret: str):
-    """Refresh an expired access token"""
-    from google.oauth2.credentials import Credentials
-    from google.auth.transport.requests import Request
-
-    try:
-        credentials = Credentials(
-            token=None,  # We don't have the current token
-            refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=client_id,
-            client_secret=client_secret
-        )
-
-        # Refresh the token
-        credentials.refresh(Request())
-
-        # Calculate new expiration time as timezone-aware UTC datetime
-        expires_at = datetime.now(pytz.utc) + timedelta(seconds=3600)  # Google tokens typically last 1 hour
+def build_event_body(event_name: str, event_description: str, start_time: datetime, end_time: datetime = None,
+                     timezone_str: str = 'UTC', rrule: str = None) -> dict:
+    """Build a Calendar API event resource (supports both one-time and recurring events)"""
+    # Default end time to 1 hour after start if not provided
+    if end_time is None:
+        end_time = start_time + timedelta(hours=1)
+
+    event = {
+        'summary': event_name,
+        'description': event_description,
+        'start': {
+            'dateTime': start_time.isoformat(),
+            'timeZone': timezone_str,
+        },
+        'end': {
+            'dateTime': end_time.isoformat(),
+            'timeZone': timezone_str,
+        },
+        'extendedProperties': {
+            'private': {EVENT_SOURCE_KEY: EVENT_SOURCE_VALUE},
+        },
+    }
 
-        return {
-            'access_token': credentials.token,
-            'expires_at': expires_at
-        }
+    # Add recurrence rule if this is a recurring event
+    if rrule:
+        # Google Calendar expects RRULE in the format: ["RRULE:FREQ=WEEKLY;BYDAY=MO"]
+        event['recurrence'] = [f"RRULE:{rrule}"]
 
-    except Exception as e:
-        print(f"Error refreshing access token: {e}")
-        return None
+    return event
 
 
-def create_calendar_event(access_token: str, event_name: str, event_description: str, start_time: datetime,
-                          end_time: datetime = None, timezone_str: str = 'UTC', rrule: str = None,
-                          refresh_token: str = None, client_id: str = None, client_secret: str = None):
-    """Create an event in Google Calendar (supports both one-time and recurring events)"""
-    try:
-        # Create credentials with all necessary fields for auto-refresh
-        credentials = Credentials(
-            token=access_token,
-            refresh_token=refresh_token,
-            token_uri="https://oauth2.googleapis.com/token" if refresh_token else None,
-            client_id=client_id,
-            client_secret=client_secret
-        )
-        service = build('calendar', 'v3', credentials=credentials)
-
-        # Default end time to 1 hour after start if not provided
-        if end_time is None:
-            end_time = start_time + timedelta(hours=1)
-
-        # Format datetime for Google Calendar API
-        start_datetime = start_time.isoformat()
-        end_datetime = end_time.isoformat()
-
-        # Create event object
-        event = {
-            'summary': event_name,
-            'description': event_description,
-            'start': {
-                'dateTime': start_datetime,
-                'timeZone': timezone_str,
-            },
-            'end': {
-                'dateTime': end_datetime,
-                'timeZone': timezone_str,
-            },
-        }
+@dataclass
+class CalendarOperation:
+    """One insert, update or delete of the calendar event for a local Event"""
+    action: str  # 'insert' | 'update' | 'delete'
+    event_id: uuid.UUID
+    body: Optional[dict] = None
+    google_event_id: Optional[str] = None
 
-        # Add recurrence rule if this is a recurring event
-        if rrule:
-            # Google Calendar expects RRULE in the format: ["RRULE:FREQ=WEEKLY;BYDAY=MO"]
-            event['recurrence'] = [f"RRULE:{rrule}"]
-            print(f"Creating recurring event with RRULE: {rrule}")
 
-        # Insert the event
-        event_result = service.events().insert(calendarId='primary', body=event).execute()
-        print(f"Event created: {event_result.get('htmlLink')}")
+class GoogleTokenRevokedError(Exception):
+    """The refresh token was revoked or expired (invalid_grant); the user has to reconnect"""
 
-        return {
-            'success': True,
-            'event_id': event_result.get('id'),
-            'event_link': event_result.get('htmlLink'),
-            'is_recurring': bool(rrule)
-        }
 
-    except HttpError as error:
-        print(f"An error occurred creating calendar event: {error}")
-        return {
-            'success': False,
-            'error': str(error)
-        }
-    except Exception as e:
-        print(f"Unexpected error creating calendar event: {e}")
-        return {
-            'success': False,
-            'error': str(e)
+def _error_message(text: str, reason: str) -> str:
+    """The message of a Google JSON error body; proxies and load balancers may answer 5xx with HTML or plain text"""
+    try:
+        return json.loads(text)['error']['message']
+    except (ValueError, KeyError, TypeError):
+        return text[:200] or reason
+
+
+class CalendarApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Calendar API error {status}: {message}")
+        self.status = status
+
+
+class GoogleCalendarClient:
+    """
+    Async Calendar v3 REST client on a pooled aiohttp session.
+
+    Talks to the REST endpoints directly, so there is no discovery document to
+    build per call and no blocking httplib2 request on the event loop.
+    """
+
+    def __init__(self, max_connections: int = 20, timeout: float = 15):
+        self.max_connections = max_connections
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily so the session binds to the running event loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=self.timeout
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def _request(self, operation: str, method: str, url: str, access_token: str, **kwargs) -> dict:
+        headers = {'Authorization': f"Bearer {access_token}"}
+        with CALENDAR_METRICS.track(operation) as result:
+            async with self.session.request(method, url, headers=headers, **kwargs) as response:
+                result['outcome'] = outcome_for_status(response.status)
+                if response.status == 204:
+                    return {}
+                if response.status >= 400:
+                    raise CalendarApiError(response.status, _error_message(await response.text(), response.reason))
+                return await response.json(content_type=None)
+
+    async def refresh_access_token(self, refresh_token: str, client_id: str, client_secret: str):
+        """Refresh an expired access token. Returns None on failure; raises GoogleTokenRevokedError on invalid_grant"""
+        try:
+            data = {
+                'grant_type': 'refresh_token',
+                'refresh_token': refresh_token,
+                'client_id': client_id,
+                'client_secret': client_secret,
+            }
+            with CALENDAR_METRICS.track("oauth.refresh") as result:
+                async with self.session.post(TOKEN_URI, data=data) as response:
+                    result['outcome'] = outcome_for_status(response.status)
+                    body = await response.json(content_type=None)
+                    if response.status >= 400:
+                        if (body or {}).get('error') == 'invalid_grant':
+                            raise GoogleTokenRevokedError(body.get('error_description', 'invalid_grant'))
+                        logging.error(f"Error refreshing access token: {response.status} {body}")
+                        return None
+
+            return {
+                'access_token': body['access_token'],
+                'expires_at': datetime.now(pytz.utc) + timedelta(seconds=int(body.get('expires_in', 3600)))
+            }
+
+        except GoogleTokenRevokedError:
+            raise
+        except Exception as e:
+            logging.error(f"Error refreshing access token: {e}")
+            return None
+
+    async def insert_event(self, access_token: str, body: dict, calendar_id: str = 'primary') -> dict:
+        url = f"{CALENDAR_API_BASE}/calendars/{quote(calendar_id)}/events"
+        return await self._request('events.insert', 'POST', url, access_token, json=body)
+
+    async def list_events(self, access_token: str, calendar_id: str = 'primary', sync_token: str = None,
+                          page_token: str = None) -> dict:
+        """
+        One page of events.list. Without `sync_token` this is a full sync; the
+        last page carries the nextSyncToken. An expired sync token raises CalendarApiError(410).
+        """
+        params = {'maxResults': 250}
+        if sync_token:
+            params['syncToken'] = sync_token
+        if page_token:
+            params['pageToken'] = page_token
+        url = f"{CALENDAR_API_BASE}/calendars/{quote(calendar_id)}/events"
+        return await self._request('events.list', 'GET', url, access_token, params=params)
+
+    async def batch(self, access_token: str, operations: List[CalendarOperation],
+                    calendar_id: str = 'primary') -> List[Tuple[int, dict]]:
+        """
+        Send up to MAX_BATCH_SIZE operations as one multipart batch request.
+        Returns one (status, body) per operation, in order; status 0 means no response for that item.
+        """
+        if len(operations) > MAX_BATCH_SIZE:
+            raise ValueError(f"A batch request takes at most {MAX_BATCH_SIZE} operations")
+
+        events_path = f"/calendar/v3/calendars/{quote(calendar_id)}/events"
+        boundary = f"batch_{uuid.uuid4().hex}"
+        parts = []
+        for index, operation in enumerate(operations):
+            if operation.action == 'insert':
+                request_line = f"POST {events_path}"
+            elif operation.action == 'update':
+                request_line = f"PUT {events_path}/{quote(operation.google_event_id)}"
+            elif operation.action == 'delete':
+                request_line = f"DELETE {events_path}/{quote(operation.google_event_id)}"
+            else:
+                raise ValueError(f"Unknown calendar operation: {operation.action}")
+
+            inner = f"{request_line} HTTP/1.1\r\n"
+            if operation.body is not None:
+                inner += f"Content-Type: application/json\r\n\r\n{json.dumps(operation.body)}"
+            else:
+                inner += "\r\n"
+
+            parts.append(f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <item-{index}>\r\n\r\n"
+                         f"{inner}\r\n")
+        payload = "".join(parts) + f"--{boundary}--\r\n"
+
+        headers = {
+            'Authorization': f"Bearer {access_token}",
+            'Content-Type': f"multipart/mixed; boundary={boundary}",
         }
+        with CALENDAR_METRICS.track("batch") as result:
+            async with self.session.post(BATCH_URL, data=payload.encode(), headers=headers) as response:
+                result['outcome'] = outcome_for_status(response.status)
+                text = await response.text()
+                if response.status >= 400:
+                    raise CalendarApiError(response.status, text[:200])
+                results = _parse_batch_response(response.headers.get('Content-Type', ''), text, len(operations))
+
+        # Per-item outcomes of the batch (no latency: items share the batch request)
+        for operation, (status, _) in zip(operations, results):
+            CALENDAR_METRICS.count(f"batch.{operation.action}", outcome_for_status(status) if status else "no_response")
+        return results
+
+    async def create_calendar_event(self, access_token: str, event_name: str, event_description: str,
+                                    start_time: datetime, end_time: datetime = None, timezone_str: str = 'UTC',
+                                    rrule: str = None, refresh_token: str = None, client_id: str = None,
+                                    client_secret: str = None, calendar_id: str = 'primary'):
+        """
+        Create an event in Google Calendar (supports both one-time and recurring events).
+        An expired access token is refreshed once; the new token is returned as `refreshed`.
+        """
+        body = build_event_body(event_name, event_description, start_time, end_time, timezone_str, rrule)
+        refreshed = None
+
+        try:
+            try:
+                event_result = await self.insert_event(access_token, body, calendar_id)
+            except CalendarApiError as error:
+                if error.status != 401 or not (refresh_token and client_id and client_secret):
+                    raise
+                refreshed = await self.refresh_access_token(refresh_token, client_id, client_secret)
+                if not refreshed:
+                    raise
+                event_result = await self.insert_event(refreshed['access_token'], body, calendar_id)
+
+            logging.info(f"Event created: {event_result.get('htmlLink')}")
+            return {
+                'success': True,
+                'event_id': event_result.get('id'),
+                'event_link': event_result.get('htmlLink'),
+                'is_recurring': bool(rrule),
+                'refreshed': refreshed
+            }
+
+        except CalendarApiError as error:
+            logging.error(f"An error occurred creating calendar event: {error}")
+            return {
+                'success': False,
+                'error': str(error)
+            }
+        except Exception as e:
+            logging.error(f"Unexpected error creating calendar event: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+
+def _parse_batch_response(content_type: str, text: str, count: int) -> List[Tuple[int, dict]]:
+    """Map the parts of a multipart/mixed batch response back to request order by Content-ID"""
+    results = [(0, {})] * count
+    boundary = content_type.split("boundary=", 1)[-1].split(";", 1)[0].strip().strip('"')
+
+    for part in text.split(f"--{boundary}"):
+        part = part.strip()
+        if not part or part == "--":
+            continue
+
+        part_headers, _, http_response = part.replace("\r\n", "\n").partition("\n\n")
+        content_id = next((line.split(":", 1)[1].strip() for line in part_headers.split("\n")
+                           if line.lower().startswith("content-id:")), "")
+        index = content_id.strip("<>").rsplit("-", 1)[-1]
+        if not index.isdigit() or int(index) >= count:
+            continue
+
+        status_line, _, rest = http_response.partition("\n")
+        _, _, body = rest.partition("\n\n")
+        try:
+            status = int(status_line.split()[1])
+        except (IndexError, ValueError):
+            continue
+        try:
+            body_json = json.loads(body) if body.strip() else {}
+        except json.JSONDecodeError:
+            body_json = {}
+        results[int(index)] = (status, body_json)
+
+    return results
 
 
 def get_oauth_client_config():
@@ -191,5 +376,5 @@ def get_oauth_client_config():
             'client_secret': settings.google_client_secret
         }
     except Exception as e:
-        print(f"Error loading OAuth client config: {e}")
+        logging.error(f"Error loading OAuth client config: {e}")
         return None
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+from services.g_calendar import GoogleCalendarClient, GoogleTokenRevokedError, get_oauth_client_config
+
+
+async def refresh_expiring_google_tokens(session_factory: sessionmaker, calendar_client: GoogleCalendarClient,
+                                         window_minutes: int, batch_size: int, max_per_run: int,
+                                         max_backoff_minutes: int = 360) -> int:
+    """
+    Scheduler job: refreshes Google access tokens expiring within the next
+    `window_minutes`, `batch_size` users at a time, so reminder creation never
+    has to wait for a token refresh. Returns the number of tokens refreshed.
+
+    Revoked refresh tokens (invalid_grant) are removed; other failures back
+    the user off exponentially so they don't hold the head of the queue.
+    """
+    oauth_config = get_oauth_client_config()
+    if not oauth_config:
+        return 0
+
+    expires_before = datetime.utcnow() + timedelta(minutes=window_minutes)
+    with session_factory() as session:
+        users = db.get_users_with_expiring_google_tokens(session, expires_before, max_per_run)
+
+    refreshed = 0
+    for offset in range(0, len(users), batch_size):
+        batch = users[offset:offset + batch_size]
+        results = await asyncio.gather(*[
+            calendar_client.refresh_access_token(refresh_token, oauth_config['client_id'],
+                                                 oauth_config['client_secret'])
+            for _, refresh_token in batch
+        ], return_exceptions=True)
+
+        with session_factory() as session:
+            for (chat_id, _), result in zip(batch, results):
+                if isinstance(result, GoogleTokenRevokedError):
+                    logging.warning(f"Google refresh token of user {chat_id} was revoked, disconnecting: {result}")
+                    db.remove_google_tokens(session, chat_id)
+                    continue
+                if not result or isinstance(result, BaseException):
+                    logging.warning(f"Background refresh of Google token failed for user {chat_id}")
+                    db.record_google_token_refresh_failure(session, chat_id, window_minutes, max_backoff_minutes)
+                    continue
+                if db.update_google_access_token(session, chat_id, result['access_token'], result['expires_at']):
+                    refreshed += 1
+
+    if users:
+        logging.info(f"Refreshed {refreshed}/{len(users)} expiring Google tokens")
+    return refreshed
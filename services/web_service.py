@@ -1,6 +1,14 @@
+import asyncio
+import gzip
+import hashlib
+import html
+import logging
 import os
 import ssl
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
+from aiogram import Bot
 from aiohttp import web
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -12,23 +20,107 @@ sys.path.append('..')
 from config.settings import Settings
 from scripts.models import create_database
 from scripts import database_crud as db
-from services.g_calendar import exchange_code_for_tokens
+from services.calendar_backfill import backfill_calendar_events
+from services.g_calendar import exchange_code_for_tokens, GoogleCalendarClient
 from utils.language_manager import LanguageManager
+from utils.logger import setup_logging
+from utils.metrics import CALENDAR_METRICS
 
+try:
+    import brotli
+except ImportError:  # in requirements.txt; without it pages are served as gzip or identity
+    brotli = None
 
-def get_session_factory():
+# Languages the success/error pages are pre-rendered in; anything else falls back to English
+PAGE_LANGUAGES = ("en", "uz", "ru")
+
+
+class RenderedPage:
+    """An HTML page encoded once, with pre-compressed variants and a strong ETag per variant"""
+
+    def __init__(self, text: str):
+        self.identity = text.encode('utf-8')
+        digest = hashlib.sha256(self.identity).hexdigest()[:32]
+        self.variants = {None: (self.identity, f'"{digest}"')}
+        self.variants['gzip'] = (gzip.compress(self.identity, compresslevel=9, mtime=0), f'"{digest}-gz"')
+        if brotli is not None:
+            self.variants['br'] = (brotli.compress(self.identity), f'"{digest}-br"')
+
+    def select(self, accept_encoding: str):
+        """(encoding, body, etag) for the best encoding the client accepts"""
+        accepted = {token.split(';', 1)[0].strip().lower() for token in accept_encoding.split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.variants:
+                return (encoding, *self.variants[encoding])
+        return (None, *self.variants[None])
+
+
+def page_language(language: str) -> str:
+    return language if language in PAGE_LANGUAGES else 'en'
+
+
+def serve_page(request, page: RenderedPage, status: int = 200, cache_control: str = 'no-cache'):
+    """Answer with the cached bytes of the negotiated variant, or 304 when the client's copy is current"""
+    encoding, body, etag = page.select(request.headers.get('Accept-Encoding', ''))
+    headers = {'ETag': etag, 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if status == 200 and if_none_match and (
+            if_none_match.strip() == '*' or etag in (tag.strip() for tag in if_none_match.split(','))):
+        return web.Response(status=304, headers=headers)
+
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return web.Response(body=body, status=status, headers=headers, content_type='text/html', charset='utf-8')
+
+
+async def prerender_pages(app: web.Application):
+    """Render the static pages and the per-language success pages once at startup"""
+    lm = app['lm']
+    app['pages'] = {
+        'welcome': RenderedPage(get_welcome_html()),
+        'privacy': RenderedPage(get_privacy_policy_html()),
+        'terms': RenderedPage(get_terms_of_service_html()),
+    }
+    for language in PAGE_LANGUAGES:
+        app['pages'][('success', language)] = RenderedPage(get_success_html(language, lm))
+
+
+async def database_context(app: web.Application):
+    """
+    One engine, session factory and worker pool for the lifetime of the app.
+    The OAuth code exchange and the token writes are blocking, so they run on
+    the pool instead of the event loop.
+    """
     settings = Settings()
+    db_url = (f"postgresql+psycopg2://{settings.db_user}:{settings.db_password}"
+              f"@{settings.db_host}:{settings.db_port}/{settings.db_name}")
+
+    app['settings'] = settings
+    app['lm'] = LanguageManager()
+    app['executor'] = ThreadPoolExecutor(max_workers=settings.web_worker_threads, thread_name_prefix="oauth")
 
-    db_user = settings.db_user
-    db_password = settings.db_password
-    db_host = settings.db_host
-    db_port = settings.db_port
-    db_name = settings.db_name
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(app['executor'], create_database, settings)
+    engine = create_engine(db_url, pool_size=settings.web_worker_threads, pool_pre_ping=True)
+    app['session_factory'] = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-    db_url = f"postgresql+psycopg2://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    create_database(settings)
-    engine = create_engine(db_url)
-    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    yield
+
+    app['executor'].shutdown(wait=True)
+    engine.dispose()
+
+
+def store_tokens(session_factory, chat_id: int, token_data: dict) -> bool:
+    with session_factory() as session:
+        return db.store_google_tokens(
+            session=session,
+            chat_id=chat_id,
+            access_token=token_data['access_token'],
+            refresh_token=token_data['refresh_token'],
+            expires_at=token_data['expires_at'],
+            calendar_id='primary'
+        )
 
 
 async def handle_google_callback(request):
@@ -46,8 +138,10 @@ async def handle_google_callback(request):
             chat_id = state_data
             language = 'en'
 
-        # Initialize language manager
-        lm = LanguageManager()
+        language = page_language(language)
+        lm = request.app['lm']
+        loop = asyncio.get_running_loop()
+        executor = request.app['executor']
 
         if error:
             return web.Response(
@@ -64,7 +158,7 @@ async def handle_google_callback(request):
             )
 
         # Exchange code for tokens
-        token_data = exchange_code_for_tokens(code)
+        token_data = await loop.run_in_executor(executor, exchange_code_for_tokens, code)
 
         if not token_data:
             return web.Response(
@@ -74,44 +168,80 @@ async def handle_google_callback(request):
             )
 
         # Store tokens in database
-        session_factory = get_session_factory()
-        with session_factory() as session:
-            success = db.store_google_tokens(
-                session=session,
-                chat_id=int(chat_id),
-                access_token=token_data['access_token'],
-                refresh_token=token_data['refresh_token'],
-                expires_at=token_data['expires_at'],
-                calendar_id='primary'
-            )
+        session_factory = request.app['session_factory']
+        success = await loop.run_in_executor(executor, store_tokens, session_factory, int(chat_id), token_data)
 
-            if success:
-                return web.Response(
-                    text=get_success_html(language, lm),
-                    content_type='text/html'
-                )
-            else:
-                return web.Response(
-                    text=get_error_html("Failed to store authentication data", language, lm),
-                    content_type='text/html',
-                    status=500
-                )
+        if success:
+            enqueue_calendar_backfill(request.app, session_factory, int(chat_id), language, lm)
+            return serve_page(request, request.app['pages'][('success', language)], cache_control='no-store')
+        else:
+            return web.Response(
+                text=get_error_html("Failed to store authentication data", language, lm),
+                content_type='text/html',
+                status=500
+            )
 
     except Exception as e:
-        print(f"error while handling callback: {e}")
+        logging.error(f"error while handling callback: {e}")
         return web.Response(
-            text=get_error_html(f"Internal server error: {str(e)}", 'en', LanguageManager()),
+            text=get_error_html(f"Internal server error: {str(e)}", 'en', request.app['lm']),
             content_type='text/html',
             status=500
         )
 
 
+def enqueue_calendar_backfill(app: web.Application, session_factory, chat_id: int, language: str,
+                              lm: LanguageManager):
+    """Start the backfill of the user's existing reminders without delaying the callback response"""
+    settings = app['settings']
+    task = asyncio.create_task(backfill_calendar_events(
+        session_factory, app['calendar_client'], app['bot'], lm, chat_id, language,
+        page_size=settings.google_backfill_page_size,
+        batch_interval=settings.google_backfill_batch_interval_seconds,
+        executor=app['executor']
+    ))
+    # Keep a reference so the task is not garbage collected mid-run
+    app['backfill_tasks'].add(task)
+    task.add_done_callback(app['backfill_tasks'].discard)
+
+
+async def calendar_backfill_context(app: web.Application):
+    """Bot and calendar client shared by backfill tasks; unfinished tasks are cancelled on shutdown"""
+    app['bot'] = Bot(token=app['settings'].telegram_bot_token)
+    app['calendar_client'] = GoogleCalendarClient()
+    app['backfill_tasks'] = set()
+
+    yield
+
+    for task in list(app['backfill_tasks']):
+        task.cancel()
+    await asyncio.gather(*app['backfill_tasks'], return_exceptions=True)
+    await app['calendar_client'].close()
+    await app['bot'].session.close()
+    logging.info("Calendar backfill resources closed")
+
+
+async def calendar_metrics_context(app: web.Application):
+    """Logs the Calendar/OAuth call metrics of this process periodically and once on shutdown"""
+    interval = app['settings'].calendar_metrics_log_minutes * 60
+
+    async def log_periodically():
+        while True:
+            await asyncio.sleep(interval)
+            CALENDAR_METRICS.log_metrics()
+
+    task = asyncio.create_task(log_periodically())
+
+    yield
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    CALENDAR_METRICS.log_metrics()
+
+
 async def handle(request):
     """Default handler with a nice welcome page"""
-    return web.Response(
-        text=get_welcome_html(),
-        content_type='text/html'
-    )
+    return serve_page(request, request.app['pages']['welcome'], cache_control='public, max-age=3600')
 
 
 async def health_check(request):
@@ -121,21 +251,34 @@ async def health_check(request):
 
 async def privacy_policy(request):
     """Privacy policy page"""
-    return web.Response(
-        text=get_privacy_policy_html(),
-        content_type='text/html'
-    )
+    return serve_page(request, request.app['pages']['privacy'], cache_control='public, max-age=3600')
 
 
 async def terms_of_service(request):
     """Terms of service page"""
-    return web.Response(
-        text=get_terms_of_service_html(),
-        content_type='text/html'
-    )
+    return serve_page(request, request.app['pages']['terms'], cache_control='public, max-age=3600')
+
+
+def create_app() -> web.Application:
+    """The OAuth web service application, without the TLS listener"""
+    app = web.Application()
+    app.cleanup_ctx.append(database_context)
+    app.cleanup_ctx.append(calendar_backfill_context)
+    app.cleanup_ctx.append(calendar_metrics_context)
+    app.on_startup.append(prerender_pages)
+    app.add_routes([
+        web.get('/', handle),
+        web.get('/health', health_check),
+        web.get('/privacy', privacy_policy),
+        web.get('/terms', terms_of_service),
+        web.get("/oath2callback", handle_google_callback)
+    ])
+    return app
 
 
 def setup_server():
+    # Without it the periodic Calendar metrics (logged at INFO) would be dropped
+    setup_logging()
     settings = Settings()
     web_host = settings.web_server_host
     web_port = int(settings.web_server_port)
@@ -149,14 +292,7 @@ def setup_server():
         f'/etc/letsencrypt/live/{web_host}/privkey.pem'
     )
 
-    app = web.Application()
-    app.add_routes([
-        web.get('/', handle),
-        web.get('/health', health_check),
-        web.get('/privacy', privacy_policy),
-        web.get('/terms', terms_of_service),
-        web.get("/oath2callback", handle_google_callback)
-    ])
+    app = create_app()
 
     print(f"🚀 Starting OAuth server on {web_host}")
     print("📋 Available endpoints:")
@@ -508,11 +644,26 @@ def get_success_html(language='en', lm=None):
     """
 
 
+# Stands in for the error message while the translated error page is rendered once per language
+_ERROR_SLOT = "\x00error_message\x00"
+
+
 def get_error_html(error_message, language='en', lm=None):
-    """Return a beautiful error page HTML with translations"""
+    """Return a beautiful error page HTML with translations; the message is escaped"""
     if not lm:
         lm = LanguageManager()
 
+    before, after = _error_page_parts(page_language(language), lm)
+    return before + html.escape(str(error_message)) + after
+
+
+@lru_cache(maxsize=32)
+def _error_page_parts(language, lm):
+    return tuple(_render_error_html(_ERROR_SLOT, language, lm).split(_ERROR_SLOT, 1))
+
+
+def _render_error_html(error_message, language, lm):
+
     # Get translated strings
     title = lm.get_string("web.error_title", language)
     subtitle = lm.get_string("web.error_subtitle", language)
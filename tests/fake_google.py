@@ -0,0 +1,267 @@
+"""
+Local fake of the Google OAuth token endpoint and the Calendar v3 endpoints
+the bot uses (events insert/update/delete/list with sync tokens, and batch),
+so the calendar paths can be tested and load-tested offline.
+
+Run it standalone and point the bot or web service at it:
+
+    python tests/fake_google.py --port 8095 [--latency-ms 80] [--error-rate 0.02]
+
+    GOOGLE_TOKEN_URI=http://127.0.0.1:8095/token
+    GOOGLE_CALENDAR_API_BASE=http://127.0.0.1:8095/calendar/v3
+    GOOGLE_CALENDAR_BATCH_URL=http://127.0.0.1:8095/batch/calendar/v3
+"""
+import argparse
+import asyncio
+import json
+import random
+import uuid
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+EVENTS_PATH = "/calendar/v3/calendars/{calendar_id}/events"
+
+
+class FakeGoogle:
+    """
+    In-memory calendars and tokens behind the fake endpoints.
+
+    Every event change gets the next sequence number; a sync token is the
+    sequence number at the time it was issued, so an incremental list returns
+    what changed after it, cancelled events included.
+    """
+
+    def __init__(self, latency: float = 0, error_rate: float = 0, page_size: int = 250):
+        self.latency = latency
+        self.error_rate = error_rate
+        # When set, injected errors are answered with this text instead of a JSON error, like a proxy's 503 page
+        self.error_page = None
+        self.page_size = page_size
+        self.calendars = {}
+        self.refresh_tokens = {}
+        self.revoked = set()
+        self.expired_access_tokens = set()
+        self.requests = {}
+        self._sequence = 0
+
+    def issue_refresh_token(self) -> str:
+        refresh_token = f"1//fake-{uuid.uuid4().hex}"
+        self.refresh_tokens[refresh_token] = f"ya29.fake-{uuid.uuid4().hex}"
+        return refresh_token
+
+    def _record(self, name: str):
+        self.requests[name] = self.requests.get(name, 0) + 1
+
+    def _change(self, calendar_id: str, event: dict) -> dict:
+        self._sequence += 1
+        event['_sequence'] = self._sequence
+        self.calendars.setdefault(calendar_id, {})[event['id']] = event
+        return event
+
+    def add_event(self, calendar_id: str, body: dict) -> dict:
+        """Create an event directly, as if the user added it in Google Calendar"""
+        event = dict(body, id=body.get('id') or uuid.uuid4().hex, status='confirmed',
+                     htmlLink=f"https://calendar.google.com/event?eid={uuid.uuid4().hex}")
+        return self._public(self._change(calendar_id, event))
+
+    @staticmethod
+    def _public(event: dict) -> dict:
+        return {key: value for key, value in event.items() if not key.startswith('_')}
+
+    def apply(self, method: str, path: str, params: dict, body: dict):
+        """Serve one Calendar request (direct or batch item). Returns (status, body)."""
+        parts = path.strip('/').split('/')
+        # calendar/v3/calendars/<calendar_id>/events[/<event_id>]
+        if len(parts) < 5 or parts[:3] != ['calendar', 'v3', 'calendars'] or parts[4] != 'events':
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        calendar_id = parts[3]
+        event_id = parts[5] if len(parts) > 5 else None
+        events = self.calendars.setdefault(calendar_id, {})
+
+        if event_id is None and method == 'POST':
+            self._record('events.insert')
+            return 200, self.add_event(calendar_id, body or {})
+        if event_id is None and method == 'GET':
+            self._record('events.list')
+            return self._list(events, params)
+
+        self._record(f"events.{method.lower()}")
+        event = events.get(event_id)
+        if event is None:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        if event['status'] == 'cancelled':
+            return 410, {'error': {'code': 410, 'message': 'Resource has been deleted'}}
+        if method == 'PUT':
+            updated = dict(body or {}, id=event_id, status='confirmed', htmlLink=event['htmlLink'])
+            return 200, self._public(self._change(calendar_id, updated))
+        if method == 'DELETE':
+            self._change(calendar_id, {'id': event_id, 'status': 'cancelled'})
+            return 204, {}
+        return 405, {'error': {'code': 405, 'message': 'Method Not Allowed'}}
+
+    def _list(self, events: dict, params: dict):
+        sync_token = params.get('syncToken')
+        if sync_token is not None and (not sync_token.isdigit() or int(sync_token) > self._sequence):
+            return 410, {'error': {'code': 410, 'message': 'Sync token is no longer valid'}}
+        since = int(sync_token) if sync_token else 0
+
+        changed = sorted((event for event in events.values() if event['_sequence'] > since),
+                         key=lambda event: event['_sequence'])
+        if sync_token is None:
+            # A full sync leaves out deleted events
+            changed = [event for event in changed if event['status'] != 'cancelled']
+
+        offset = int(params.get('pageToken') or 0)
+        page_size = min(int(params.get('maxResults') or self.page_size), self.page_size)
+        page = {'kind': 'calendar#events', 'items': [self._public(event)
+                                                     for event in changed[offset:offset + page_size]]}
+        if offset + page_size < len(changed):
+            page['nextPageToken'] = str(offset + page_size)
+        else:
+            page['nextSyncToken'] = str(self._sequence)
+        return 200, page
+
+
+FAKE_GOOGLE = web.AppKey("fake_google", FakeGoogle)
+
+
+def _authorized(fake: FakeGoogle, request: web.Request) -> bool:
+    token = request.headers.get('Authorization', '')[len('Bearer '):]
+    return bool(token) and token not in fake.expired_access_tokens
+
+
+async def _simulate(fake: FakeGoogle):
+    """Network latency and random server errors; returns an error response or None"""
+    if fake.latency:
+        await asyncio.sleep(fake.latency)
+    if fake.error_rate and random.random() < fake.error_rate:
+        if fake.error_page is not None:
+            return web.Response(body=fake.error_page.encode(), status=503, content_type='text/html')
+        return web.json_response({'error': {'code': 503, 'message': 'Backend Error'}}, status=503)
+    return None
+
+
+async def handle_token(request: web.Request) -> web.Response:
+    fake = request.app[FAKE_GOOGLE]
+    error = await _simulate(fake)
+    if error is not None:
+        return error
+
+    form = await request.post()
+    fake._record(f"token.{form.get('grant_type')}")
+    if form.get('grant_type') == 'authorization_code':
+        refresh_token = fake.issue_refresh_token()
+        return web.json_response({
+            'access_token': fake.refresh_tokens[refresh_token], 'refresh_token': refresh_token,
+            'expires_in': 3599, 'token_type': 'Bearer', 'scope': 'https://www.googleapis.com/auth/calendar.events',
+        })
+    if form.get('grant_type') == 'refresh_token':
+        refresh_token = form.get('refresh_token')
+        if refresh_token in fake.revoked or refresh_token not in fake.refresh_tokens:
+            return web.json_response({'error': 'invalid_grant', 'error_description': 'Token has been expired or revoked.'},
+                                     status=400)
+        access_token = f"ya29.fake-{uuid.uuid4().hex}"
+        fake.refresh_tokens[refresh_token] = access_token
+        return web.json_response({'access_token': access_token, 'expires_in': 3599, 'token_type': 'Bearer'})
+    return web.json_response({'error': 'unsupported_grant_type'}, status=400)
+
+
+async def handle_events(request: web.Request) -> web.Response:
+    fake = request.app[FAKE_GOOGLE]
+    error = await _simulate(fake)
+    if error is not None:
+        return error
+    if not _authorized(fake, request):
+        return web.json_response({'error': {'code': 401, 'message': 'Invalid Credentials'}}, status=401)
+
+    body = await request.json() if request.can_read_body else None
+    status, response_body = fake.apply(request.method, request.path, dict(request.query), body)
+    if status == 204:
+        return web.Response(status=204)
+    return web.json_response(response_body, status=status)
+
+
+async def handle_batch(request: web.Request) -> web.Response:
+    fake = request.app[FAKE_GOOGLE]
+    error = await _simulate(fake)
+    if error is not None:
+        return error
+    fake._record('batch')
+
+    boundary = request.headers.get('Content-Type', '').split('boundary=', 1)[-1].strip('"')
+    text = await request.text()
+    authorized = _authorized(fake, request)
+
+    response_boundary = f"batch_{uuid.uuid4().hex}"
+    parts = []
+    for part in text.split(f"--{boundary}"):
+        part = part.strip()
+        if not part or part == '--':
+            continue
+        part_headers, _, inner = part.replace('\r\n', '\n').partition('\n\n')
+        content_id = next((line.split(':', 1)[1].strip() for line in part_headers.split('\n')
+                           if line.lower().startswith('content-id:')), '')
+        request_line, _, rest = inner.partition('\n')
+        _, _, inner_body = rest.partition('\n\n')
+        method, path = request_line.split()[:2]
+
+        if authorized:
+            status, body = fake.apply(method, path, {}, json.loads(inner_body) if inner_body.strip() else None)
+        else:
+            status, body = 401, {'error': {'code': 401, 'message': 'Invalid Credentials'}}
+        reason = {200: 'OK', 204: 'No Content'}.get(status, 'Error')
+        payload = "\r\n" if status == 204 else f"Content-Type: application/json\r\n\r\n{json.dumps(body)}"
+        parts.append(f"--{response_boundary}\r\nContent-Type: application/http\r\n"
+                     f"Content-ID: <response-{content_id.strip('<>')}>\r\n\r\n"
+                     f"HTTP/1.1 {status} {reason}\r\n{payload}\r\n")
+
+    return web.Response(body=(''.join(parts) + f"--{response_boundary}--\r\n").encode(),
+                        headers={'Content-Type': f"multipart/mixed; boundary={response_boundary}"})
+
+
+def create_fake_google_app(fake: FakeGoogle = None) -> web.Application:
+    app = web.Application()
+    app[FAKE_GOOGLE] = fake or FakeGoogle()
+    app.add_routes([
+        web.post('/token', handle_token),
+        web.route('*', EVENTS_PATH, handle_events),
+        web.route('*', EVENTS_PATH + '/{event_id}', handle_events),
+        web.post('/batch/calendar/v3', handle_batch),
+    ])
+    return app
+
+
+@asynccontextmanager
+async def run_fake_google(fake: FakeGoogle = None, host: str = '127.0.0.1', port: int = 0):
+    """Serve a fake on a local port; yields (fake, base_url)"""
+    app = create_fake_google_app(fake)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=host, port=port)
+    await site.start()
+    bound_port = runner.addresses[0][1]
+    try:
+        yield app[FAKE_GOOGLE], f"http://{host}:{bound_port}"
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Google OAuth/Calendar server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8095)
+    parser.add_argument('--latency-ms', type=float, default=0, help="added to every request")
+    parser.add_argument('--error-rate', type=float, default=0, help="fraction of requests answered with 503")
+    args = parser.parse_args()
+
+    fake = FakeGoogle(latency=args.latency_ms / 1000, error_rate=args.error_rate)
+    base_url = f"http://{args.host}:{args.port}"
+    print(f"GOOGLE_TOKEN_URI={base_url}/token")
+    print(f"GOOGLE_CALENDAR_API_BASE={base_url}/calendar/v3")
+    print(f"GOOGLE_CALENDAR_BATCH_URL={base_url}/batch/calendar/v3")
+    web.run_app(create_fake_google_app(fake), host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""GoogleCalendarClient against the local fake Calendar/OAuth server"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from tests.fake_google import FakeGoogle, run_fake_google
+
+
+@pytest.fixture
+def calendar(monkeypatch):
+    """Runs a coroutine function as fn(client, fake) with the client pointed at a fresh fake server"""
+    from services import g_calendar
+
+    def run(test, fake=None):
+        async def main():
+            async with run_fake_google(fake) as (server, base_url):
+                monkeypatch.setattr(g_calendar, "TOKEN_URI", f"{base_url}/token")
+                monkeypatch.setattr(g_calendar, "CALENDAR_API_BASE", f"{base_url}/calendar/v3")
+                monkeypatch.setattr(g_calendar, "BATCH_URL", f"{base_url}/batch/calendar/v3")
+                client = g_calendar.GoogleCalendarClient()
+                try:
+                    return await test(client, server)
+                finally:
+                    await client.close()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def event_body(name: str) -> dict:
+    return {"summary": name, "start": {"dateTime": "2030-01-01T09:00:00Z"}, "end": {"dateTime": "2030-01-01T10:00:00Z"}}
+
+
+def test_refresh_access_token(calendar):
+    from services.g_calendar import GoogleTokenRevokedError
+
+    async def test(client, fake):
+        refresh_token = fake.issue_refresh_token()
+        refreshed = await client.refresh_access_token(refresh_token, "client", "secret")
+        assert refreshed["access_token"] == fake.refresh_tokens[refresh_token]
+
+        fake.revoked.add(refresh_token)
+        with pytest.raises(GoogleTokenRevokedError):
+            await client.refresh_access_token(refresh_token, "client", "secret")
+
+    calendar(test)
+
+
+def test_batch_returns_item_results_in_order(calendar):
+    from services.g_calendar import CalendarOperation
+
+    async def test(client, fake):
+        existing = fake.add_event("primary", event_body("existing"))
+        operations = [
+            CalendarOperation(action="insert", event_id=uuid.uuid4(), body=event_body("new")),
+            CalendarOperation(action="update", event_id=uuid.uuid4(), body=event_body("renamed"),
+                              google_event_id=existing["id"]),
+            CalendarOperation(action="delete", event_id=uuid.uuid4(), google_event_id="missing"),
+        ]
+        results = await client.batch("ya29.token", operations)
+
+        assert [status for status, _ in results] == [200, 200, 404]
+        assert results[0][1]["id"] in fake.calendars["primary"]
+        assert fake.calendars["primary"][existing["id"]]["summary"] == "renamed"
+        assert fake.requests["batch"] == 1
+
+    calendar(test)
+
+
+def test_list_events_incremental_sync(calendar):
+    from services.g_calendar import CalendarApiError
+
+    async def test(client, fake):
+        kept = fake.add_event("primary", event_body("kept"))
+        deleted = fake.add_event("primary", event_body("deleted"))
+
+        full = await client.list_events("ya29.token")
+        assert {item["id"] for item in full["items"]} == {kept["id"], deleted["id"]}
+
+        fake.apply("DELETE", f"/calendar/v3/calendars/primary/events/{deleted['id']}", {}, None)
+        added = fake.add_event("primary", event_body("added"))
+        changes = await client.list_events("ya29.token", sync_token=full["nextSyncToken"])
+        assert [(item["id"], item["status"]) for item in changes["items"]] == [
+            (deleted["id"], "cancelled"), (added["id"], "confirmed")
+        ]
+
+        with pytest.raises(CalendarApiError) as error:
+            await client.list_events("ya29.token", sync_token="999999")
+        assert error.value.status == 410
+
+    calendar(test)
+
+
+def test_list_events_pages(calendar):
+    async def test(client, fake):
+        for number in range(5):
+            fake.add_event("primary", event_body(f"event {number}"))
+
+        first = await client.list_events("ya29.token")
+        second = await client.list_events("ya29.token", page_token=first["nextPageToken"])
+        assert len(first["items"]) == 3 and len(second["items"]) == 2
+        assert "nextSyncToken" in second
+
+    calendar(test, FakeGoogle(page_size=3))
+
+
+def test_create_calendar_event_refreshes_expired_token(calendar):
+    async def test(client, fake):
+        refresh_token = fake.issue_refresh_token()
+        fake.expired_access_tokens.add("ya29.expired")
+
+        result = await client.create_calendar_event(
+            "ya29.expired", "dentist", "", datetime(2030, 1, 1, 9),
+            refresh_token=refresh_token, client_id="client", client_secret="secret"
+        )
+
+        assert result["success"]
+        assert result["refreshed"]["access_token"] == fake.refresh_tokens[refresh_token]
+        assert fake.requests["events.insert"] == 1
+
+    calendar(test)
+
+
+def test_non_json_error_body_raises_api_error(calendar):
+    from services.g_calendar import CalendarApiError
+
+    async def test(client, fake):
+        fake.error_rate = 1
+        fake.error_page = "<html><body>502 Bad Gateway</body></html>"
+        with pytest.raises(CalendarApiError) as error:
+            await client.insert_event("ya29.token", event_body("behind a proxy"))
+        assert error.value.status == 503
+        assert "502 Bad Gateway" in str(error.value)
+
+    calendar(test)
+
+
+def test_calls_are_recorded_in_metrics(calendar):
+    from utils.metrics import CALENDAR_METRICS
+
+    before = dict(CALENDAR_METRICS.metrics()["counts"])
+
+    async def test(client, fake):
+        await client.insert_event("ya29.token", event_body("tracked"))
+        fake.error_rate = 1
+        with pytest.raises(Exception):
+            await client.insert_event("ya29.token", event_body("failed"))
+
+    calendar(test)
+
+    counts = CALENDAR_METRICS.metrics()["counts"]
+    assert counts[("events.insert", "ok")] == before.get(("events.insert", "ok"), 0) + 1
+    assert counts[("events.insert", "server_error")] == before.get(("events.insert", "server_error"), 0) + 1
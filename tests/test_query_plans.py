@@ -0,0 +1,53 @@
+"""
+EXPLAIN regression tests: the hot reminder queries must stay on the indexes
+added for them. Sequential scans are disabled so the plan shows whether an
+index is usable at all, independent of how little data the test database holds.
+"""
+from datetime import datetime
+
+
+def explain(pg_engine, statement, parameters) -> str:
+    connection = pg_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        cursor.execute("EXPLAIN " + statement, parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    finally:
+        connection.rollback()
+        connection.close()
+
+
+def only_select(captured):
+    selects = [(statement, parameters) for statement, parameters in captured
+               if statement.lstrip().upper().startswith(("SELECT", "WITH"))]
+    assert len(selects) == 1, selects
+    return selects[0]
+
+
+def test_active_reminders_page_uses_partial_index(pg_engine, session_factory, reminder_user, captured_statements):
+    from scripts import database_crud as db
+
+    with session_factory() as session:
+        db.get_active_reminders_page(session, reminder_user["user_id"], 6)
+
+    assert "ix_events_user_id_active" in explain(pg_engine, *only_select(captured_statements))
+
+
+def test_firing_context_uses_job_id_index(pg_engine, session_factory, reminder_user, captured_statements):
+    from scripts import database_crud as db
+
+    with session_factory() as session:
+        db.get_reminder_firing_context(session, reminder_user["job_ids"][0])
+
+    assert "schedules_job_id_key" in explain(pg_engine, *only_select(captured_statements))
+
+
+def test_archive_batch_uses_finished_index(pg_engine, session_factory, reminder_user, captured_statements):
+    from scripts import database_crud as db
+
+    with session_factory() as session:
+        # Nothing is that old, so only the batch SELECT runs
+        db.archive_finished_events(session, datetime(2000, 1, 1), 100)
+
+    assert "ix_events_finished_updated_at" in explain(pg_engine, *only_select(captured_statements))
@@ -0,0 +1,51 @@
+"""
+A reminder fire is the hottest write path: it must cost one SELECT for the
+firing context and one UPDATE for the new status, whatever kind of reminder it is.
+"""
+import asyncio
+import re
+
+import pytest
+
+
+class FakeSession:
+    async def close(self):
+        pass
+
+
+class FakeBot:
+    sent = []
+
+    def __init__(self, token, default=None):
+        self.session = FakeSession()
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        self.sent.append((chat_id, text))
+
+
+def statement_kinds(captured):
+    kinds = []
+    for statement, _ in captured:
+        statement = statement.lstrip().upper()
+        if statement.startswith(("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")):
+            continue
+        # A CTE that updates schedules and events together is still a single UPDATE
+        kinds.append("UPDATE" if re.search(r"\bUPDATE\b", statement) else statement.split(None, 1)[0])
+    return kinds
+
+
+@pytest.mark.parametrize("job_index", [0, 1], ids=["one_time", "recurring"])
+def test_send_reminder_runs_one_select_and_one_update(monkeypatch, session_factory, reminder_user,
+                                                      captured_statements, job_index):
+    from scripts import bot_handlers
+
+    monkeypatch.setattr(bot_handlers, "Bot", FakeBot)
+    monkeypatch.setattr(bot_handlers, "SESSION_FACTORY", session_factory)
+    FakeBot.sent = []
+
+    asyncio.run(bot_handlers.send_reminder(
+        "123456:test-token", reminder_user["chat_id"], "test", "test", reminder_user["job_ids"][job_index]
+    ))
+
+    assert FakeBot.sent and FakeBot.sent[0][0] == reminder_user["chat_id"]
+    assert statement_kinds(captured_statements) == ["SELECT", "UPDATE"]
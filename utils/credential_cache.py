@@ -0,0 +1,56 @@
+import threading
+from typing import Hashable, Optional
+
+from cachetools import TTLCache
+
+
+class CredentialCache:
+    """
+    Short-lived cache of decrypted credentials (dicts) keyed by chat_id.
+
+    Entries are cleared in place when they expire, are evicted or are
+    invalidated, so the cache never keeps decrypted tokens reachable past
+    their TTL. Callers get a copy and never hold the cached dict itself.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60):
+        self._cache = _ClearingTTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[dict]:
+        with self._lock:
+            self._cache.expire()
+            credentials = self._cache.get(key)
+            return dict(credentials) if credentials is not None else None
+
+    def set(self, key: Hashable, credentials: dict):
+        with self._lock:
+            self._pop(key)
+            self._cache[key] = dict(credentials)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._pop(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            self._cache.expire()
+            return key in self._cache
+
+    def _pop(self, key: Hashable):
+        credentials = self._cache.pop(key, None)
+        if credentials is not None:
+            credentials.clear()
+
+
+class _ClearingTTLCache(TTLCache):
+    def popitem(self):
+        key, credentials = super().popitem()
+        credentials.clear()
+        return key, credentials
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for _, credentials in expired:
+            credentials.clear()
+        return expired
@@ -1,19 +1,49 @@
 import logging
+from typing import Dict, Iterable, Tuple, Union
 
-from aiogram import F
 from aiogram.filters import Filter
+from aiogram.types import Message
 from utils.language_manager import LanguageManager
 
 
-def TranslatedText(lm: LanguageManager, key: str) -> Filter:
-    try:
-        keys = key.split(".")
-        translation_dict = lm.translations
-        for k in keys:
-            translation_dict = translation_dict[k]
+def build_button_index(lm: LanguageManager, keys: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+    """Reverse index from every translated button text to its (key, lang)."""
+    index = {}
+    for key in keys:
+        try:
+            translation_dict = lm.translations
+            for k in key.split("."):
+                translation_dict = translation_dict[k]
+        except (KeyError, TypeError):
+            logging.warning(f"Warning: Could not index translation key: {key}. Key not found.")
+            continue
 
-        all_translation = list(translation_dict.values())
-        return F.text.in_(all_translation)
-    except (KeyError, AttributeError):
-        logging.warning(f"Warning: Could not create filter for translation key: {key}. Key not found.")
-        return F.text.func(lambda text: False)
+        for lang, text in translation_dict.items():
+            if not isinstance(text, str):
+                continue
+            if text in index and index[text][0] != key:
+                logging.warning(f"Button text '{text}' is shared by {index[text][0]} and {key}")
+                continue
+            index.setdefault(text, (key, lang))
+    return index
+
+
+class TranslatedButton(Filter):
+    """
+    Matches a message whose text is one of the given buttons in any language with
+    a single dict lookup, and passes `button_key` and `button_lang` to the handler.
+    """
+
+    def __init__(self, lm: LanguageManager, keys: Iterable[str]):
+        self.index = build_button_index(lm, keys)
+
+    async def __call__(self, message: Message) -> Union[bool, Dict[str, str]]:
+        if not message.text:
+            return False
+
+        match = self.index.get(message.text)
+        if match is None:
+            return False
+
+        key, lang = match
+        return {"button_key": key, "button_lang": lang}
@@ -0,0 +1,107 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, math.inf)
+
+
+def outcome_for_status(status: int) -> str:
+    """Collapse an HTTP status into the outcome label used by the counters"""
+    if status < 400:
+        return "ok"
+    if status == 401:
+        return "unauthorized"
+    if status == 410:
+        return "gone"
+    if status in (403, 429):
+        return "rate_limited"
+    if status >= 500:
+        return "server_error"
+    return "client_error"
+
+
+class OperationMetrics:
+    """
+    In-process counters per (operation, outcome) and latency histograms per
+    operation, for outbound calls that otherwise only show up in logs.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._counts = defaultdict(int)
+        self._latency_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+        self._latency_sum = defaultdict(float)
+
+    def count(self, operation: str, outcome: str, amount: int = 1):
+        with self._lock:
+            self._counts[(operation, outcome)] += amount
+
+    def observe(self, operation: str, outcome: str, seconds: float):
+        with self._lock:
+            self._counts[(operation, outcome)] += 1
+            self._latency_buckets[operation][bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self._latency_sum[operation] += seconds
+
+    @contextmanager
+    def track(self, operation: str):
+        """
+        Time the block and record it. The outcome is "ok", "exception" if the
+        block raised, or whatever the block sets as `result["outcome"]`.
+        """
+        result = {"outcome": "ok"}
+        started = time.perf_counter()
+        try:
+            yield result
+        except BaseException:
+            if result["outcome"] == "ok":
+                result["outcome"] = "exception"
+            raise
+        finally:
+            self.observe(operation, result["outcome"], time.perf_counter() - started)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latency = {}
+            for operation, buckets in self._latency_buckets.items():
+                total = sum(buckets)
+                latency[operation] = {
+                    "count": total,
+                    "avg": self._latency_sum[operation] / total if total else 0,
+                    "p50": _bucket_quantile(buckets, total, 0.5),
+                    "p95": _bucket_quantile(buckets, total, 0.95),
+                    "buckets": dict(zip(LATENCY_BUCKETS, buckets)),
+                }
+            return {"counts": dict(self._counts), "latency": latency}
+
+    def log_metrics(self):
+        metrics = self.metrics()
+        for operation, stats in sorted(metrics["latency"].items()):
+            outcomes = ", ".join(f"{outcome}={count}" for (op, outcome), count in sorted(metrics["counts"].items())
+                                 if op == operation)
+            logging.info(f"{self.name} {operation}: {outcomes}; avg={stats['avg']:.3f}s "
+                         f"p50<={stats['p50']}s p95<={stats['p95']}s")
+        for (operation, outcome), count in sorted(metrics["counts"].items()):
+            if operation not in metrics["latency"]:
+                logging.info(f"{self.name} {operation}: {outcome}={count}")
+
+
+def _bucket_quantile(buckets: list, total: int, quantile: float) -> float:
+    """Upper bound of the bucket holding the given quantile"""
+    if not total:
+        return 0
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS, buckets):
+        seen += count
+        if seen >= quantile * total:
+            return bound
+    return math.inf
+
+
+# Google Calendar and OAuth calls
+CALENDAR_METRICS = OperationMetrics("Calendar")
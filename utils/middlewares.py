@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from sqlalchemy.orm import sessionmaker
+
+from scripts import database_crud as db
+
+
+class ChatSerializationMiddleware(BaseMiddleware):
+    """
+    Processes updates from the same chat one at a time, in arrival order, while
+    updates from different chats run in parallel up to `max_concurrency`.
+
+    Register as an outer middleware on `dp.update` so it wraps every handler.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._global_slots = asyncio.Semaphore(max_concurrency)
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        # Updates per chat that are waiting or being handled
+        self._chat_depth: Dict[int, int] = defaultdict(int)
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any],
+    ) -> Any:
+        chat = data.get("event_chat")
+        if chat is None:
+            async with self._global_slots:
+                return await handler(event, data)
+
+        chat_id = chat.id
+        lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+        self._chat_depth[chat_id] += 1
+        try:
+            # Take the chat lock first so a queued chat doesn't hold a global slot
+            async with lock:
+                async with self._global_slots:
+                    return await handler(event, data)
+        finally:
+            self._chat_depth[chat_id] -= 1
+            if not self._chat_depth[chat_id]:
+                del self._chat_depth[chat_id]
+                self._chat_locks.pop(chat_id, None)
+
+    def queue_depth(self, chat_id: int) -> int:
+        """Updates from this chat that are queued or being handled"""
+        return self._chat_depth.get(chat_id, 0)
+
+    def metrics(self) -> dict:
+        depths = dict(self._chat_depth)
+        return {
+            "in_flight": self.max_concurrency - self._global_slots._value,
+            "active_chats": len(depths),
+            "queued_updates": sum(depth - 1 for depth in depths.values()),
+            "max_chat_depth": max(depths.values(), default=0),
+            "chat_depths": depths,
+        }
+
+    def log_metrics(self):
+        metrics = self.metrics()
+        logging.info(f"Update queue: in_flight={metrics['in_flight']}, active_chats={metrics['active_chats']}, "
+                     f"queued={metrics['queued_updates']}, max_chat_depth={metrics['max_chat_depth']}")
+
+
+class DuplicateUpdateMiddleware(BaseMiddleware):
+    """
+    Drops updates that were already handled, before any AI or DB work is done.
+
+    Updates are keyed by `update_id` and, for messages, by (chat_id, message_id).
+    Recent keys are kept in a bounded in-memory set; when a session factory is
+    given, update ids are also recorded in the `processed_updates` table so
+    duplicates are caught across restarts.
+
+    Register as the first outer middleware on `dp.update`.
+    """
+
+    def __init__(self, max_size: int, session_factory: Optional[sessionmaker] = None):
+        self.max_size = max_size
+        self.session_factory = session_factory
+        self._seen: OrderedDict = OrderedDict()
+        self.dropped = 0
+
+    def _remember(self, key) -> bool:
+        """Returns False if the key was already seen"""
+        if key in self._seen:
+            self._seen.move_to_end(key)
+            return False
+
+        self._seen[key] = None
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+        return True
+
+    def _claim(self, update_id: int) -> bool:
+        with self.session_factory() as session:
+            return db.claim_update(session, update_id)
+
+    async def _is_duplicate(self, update: Update) -> bool:
+        keys = [("update", update.update_id)]
+        if update.message:
+            keys.append(("message", update.message.chat.id, update.message.message_id))
+
+        # Evaluate every key so each one is remembered
+        fresh = [self._remember(key) for key in keys]
+        if not all(fresh):
+            return True
+
+        if self.session_factory:
+            # The INSERT ... RETURNING is a blocking round trip; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            return not await loop.run_in_executor(None, self._claim, update.update_id)
+        return False
+
+    async def __call__(
+            self,
+            handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+            event: TelegramObject,
+            data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update) and await self._is_duplicate(event):
+            self.dropped += 1
+            logging.info(f"Dropped duplicate update {event.update_id} ({self.dropped} dropped so far)")
+            return None
+
+        return await handler(event, data)
+
+    def cleanup(self, ttl_hours: int) -> int:
+        """Scheduler job: forgets recorded update ids older than the TTL"""
+        if not self.session_factory:
+            return 0
+
+        with self.session_factory() as session:
+            removed = db.delete_processed_updates_before(session, datetime.utcnow() - timedelta(hours=ttl_hours))
+        if removed:
+            logging.info(f"Removed {removed} processed update ids older than {ttl_hours}h")
+        return removed